@@ -0,0 +1,108 @@
+import multiprocessing
+import queue
+import time
+
+from replay import encode
+from solver import NodeLimit, Puzzle, SearchCancelled, SearchTimeout, Solver
+
+# Як часто (в секундах) процес розв'язувача надсилає повідомлення про прогрес
+PROGRESS_INTERVAL = 0.1
+
+# Скільки (с) 'terminate' чекає, поки скасований пошук завершиться сам
+# (пошук "parallel" при цьому зупиняє власний пул процесів)
+TERMINATE_GRACE = 1.0
+
+
+def solve_worker(board, messages, cancel, algorithm, heuristic, timeout, max_nodes, weight=None):
+    #Виконується в окремому процесі. Надсилає в чергу 'messages' кортежі:
+    #- ("progress", expanded, bound, elapsed) - не частіше PROGRESS_INTERVAL
+    #- ("done", moves, expanded, elapsed) - знайдений розв'язок (рядок ходів, див. replay);
+    #  для "arastar" скасування і обмеження повертають найкращий знайдений розв'язок
+    #- ("failed", reason, expanded, elapsed) - reason: "timeout", "nodes",
+    #  "cancelled", "unsolved" або текст помилки
+    last = [0.0]
+
+    def progress(solver):
+        if cancel.is_set():
+            raise SearchCancelled()
+        now = time.perf_counter()
+        if now - last[0] >= PROGRESS_INTERVAL:
+            last[0] = now
+            messages.put(("progress", solver.expanded, solver.bound, solver.elapsed))
+
+    solver = Solver(Puzzle(board), algorithm, heuristic, timeout, max_nodes=max_nodes, progress=progress,
+                    weight=weight)
+    try:
+        path = solver.solve()
+    except SearchTimeout:
+        messages.put(("failed", "timeout", solver.expanded, solver.elapsed))
+    except NodeLimit:
+        messages.put(("failed", "nodes", solver.expanded, solver.elapsed))
+    except SearchCancelled:
+        messages.put(("failed", "cancelled", solver.expanded, solver.elapsed))
+    except Exception as error:
+        messages.put(("failed", str(error), solver.expanded, solver.elapsed))
+    else:
+        if path is None:
+            messages.put(("failed", "unsolved", solver.expanded, solver.elapsed))
+        else:
+            moves = encode([node.action for node in path][1:])
+            messages.put(("done", moves, solver.expanded, solver.elapsed))
+
+
+class SolveProcess:
+    #Розв'язувач в окремому процесі з обміном повідомленнями через чергу,
+    #щоб пошук не блокував головний цикл вікна (див. solve_worker).
+    #- 'board' - список списків дошки
+    #- 'timeout', 'max_nodes' - обмеження часу (с) та розкритих вузлів, якщо є
+    #- 'weight' - вага евристики для "weighted" і "arastar" (див. Solver)
+
+    def __init__(self, board, algorithm="astar", heuristic="manhattan", timeout=None, max_nodes=None,
+                 weight=None):
+        # "spawn" не копіює стан батьківського процесу (зокрема, вікно pygame).
+        # Процес не демонічний, бо пошук "parallel" запускає власні процеси;
+        # власник має викликати 'terminate' перед виходом
+        context = multiprocessing.get_context("spawn")
+        self.messages = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=solve_worker,
+            args=([list(row) for row in board], self.messages, self.cancel_event,
+                  algorithm, heuristic, timeout, max_nodes, weight))
+        self.finished = False
+
+    def start(self):
+        self.process.start()
+
+    def poll(self):
+        #Повертає список повідомлень, що надійшли від процесу, не блокуючи
+        result = []
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            result.append(message)
+            if message[0] != "progress":
+                self.finished = True
+        if self.finished and self.process.is_alive():
+            self.process.join(timeout=0)
+        elif not self.finished and self.process.exitcode not in (None, 0):
+            # Процес аварійно завершився, не надіславши результату
+            self.finished = True
+            result.append(("failed", "exit code %d" % self.process.exitcode, 0, 0.0))
+        return result
+
+    def cancel(self):
+        #Просить процес зупинити пошук; відповідь прийде як ("failed", "cancelled", ...)
+        self.cancel_event.set()
+
+    def terminate(self):
+        #Зупиняє процес: спершу скасуванням, а якщо він не завершився за
+        #TERMINATE_GRACE секунд - примусово
+        if self.process.is_alive():
+            self.cancel_event.set()
+            self.process.join(timeout=TERMINATE_GRACE)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache import SolutionCache
+from game import Game, is_valid_board
+from replay import encode
+from solver import HEURISTICS, Puzzle, SearchTimeout, Solver
+
+
+_caches = {}
+
+
+def worker_cache(path):
+    #Повертає кеш розв'язків процесу-обробника для бази 'path' (один на процес)
+    if path not in _caches:
+        _caches[path] = SolutionCache(path=path)
+    return _caches[path]
+
+
+def new_result(index, board_str):
+    #Порожній результат для дошки (див. solve_board)
+    return {"index": index, "board": board_str, "status": "solved", "moves": None, "length": None,
+            "suboptimality": None, "expanded": 0, "time": 0.0, "stats": None, "error": None}
+
+
+def solve_board(index, board_str, size=4, algorithm="astar", heuristic="manhattan", timeout=None,
+                cache_path=None, weight=None):
+    #Розв'язує одну дошку у процесі-обробнику і повертає словник з результатом:
+    #- 'status' - "solved", "timeout", "invalid", "unsolvable" або "error"
+    #  (будь-яка інша помилка пошуку; текст - у 'error')
+    #- 'moves' - список дій тайлу '0' (див. Game.move), 'length' - їх кількість
+    #- 'expanded' - кількість розкритих вузлів, 'time' - час пошуку в секундах
+    #- 'suboptimality' - межа відношення 'length' до оптимальної довжини
+    #  (див. Solver.suboptimality); 1 для оптимальних алгоритмів, None, якщо
+    #  межа невідома ("reduction"), - JSON не має значення Infinity
+    #- 'stats' - лічильники пошуку (див. SearchStats), якщо пошук виконувався
+    result = new_result(index, board_str)
+
+    puzzle = Puzzle.from_string(board_str, size)
+    if puzzle is None or not is_valid_board(puzzle.board, size):
+        result["status"] = "invalid"
+        return result
+    if not Game.is_solvable(puzzle):
+        result["status"] = "unsolvable"
+        return result
+
+    tic = time.perf_counter()
+    try:
+        cache = worker_cache(cache_path) if cache_path is not None else None
+        solver = Solver(puzzle, algorithm, heuristic, timeout, cache, weight=weight)
+    except Exception as error:  # Наприклад, відсутній файл таблиць "pdb"
+        return failed(result, error)
+    try:
+        path = solver.solve()
+    except SearchTimeout:
+        result["status"] = "timeout"
+    except Exception as error:  # Інші SearchLimit або помилки алгоритму
+        result["expanded"] = solver.expanded
+        return failed(result, error, time.perf_counter() - tic)
+    else:
+        moves = [node.action for node in path][1:] if path is not None else []
+        result["moves"] = moves
+        result["length"] = len(moves)
+        result["suboptimality"] = solver.suboptimality if solver.suboptimality != float("inf") else None
+    result["time"] = time.perf_counter() - tic
+    result["expanded"] = solver.expanded
+    result["stats"] = solver.stats.as_dict()
+    return result
+
+
+def failed(result, error, elapsed=0.0):
+    #Позначає результат 'result' як помилку 'error' і повертає його
+    result["status"] = "error"
+    result["error"] = "%s: %s" % (type(error).__name__, error)
+    result["time"] = elapsed
+    return result
+
+
+def collect(future, index, board_str):
+    #Результат завершеного завдання; помилка самого пулу (наприклад,
+    #аварійне завершення процесу) стає результатом "error" для цієї дошки
+    try:
+        return future.result()
+    except Exception as error:
+        return failed(new_result(index, board_str), error)
+
+
+def read_boards(lines):
+    #Генерує непорожні рядки з дошками (формат 'Puzzle.from_string')
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def solve_many(boards, workers=None, ordered=True, size=4, algorithm="astar", heuristic="manhattan",
+               timeout=None, cache_path=None, weight=None):
+    #Розв'язує дошки з ітератора 'boards' на пулі процесів і генерує результати
+    #'solve_board' у вхідному порядку ('ordered') або в порядку завершення.
+    #Одночасно в роботі тримається не більше ніж кілька дошок на процес, тож
+    #вхід може бути як завгодно довгим
+
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque() if ordered else {}
+        for index, board_str in enumerate(boards):
+            future = executor.submit(solve_board, index, board_str, size, algorithm, heuristic, timeout,
+                                     cache_path, weight)
+            if ordered:
+                pending.append((future, index, board_str))
+                if len(pending) >= window:
+                    yield collect(*pending.popleft())
+            else:
+                pending[future] = (index, board_str)
+                if len(pending) >= window:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield collect(future, *pending.pop(future))
+
+        if ordered:
+            while pending:
+                yield collect(*pending.popleft())
+        else:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield collect(future, *pending.pop(future))
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетне розв'язання дошок (одна дошка на рядок)")
+    parser.add_argument("input", help="файл з дошками або '-' для стандартного вводу")
+    parser.add_argument("-o", "--output", help="файл результатів JSON Lines (за замовчуванням stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="кількість процесів")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="обмеження часу на дошку, с (для 'arastar' - бюджет покращення розв'язку)")
+    parser.add_argument("--unordered", action="store_true", help="виводити результати в порядку завершення")
+    parser.add_argument("--compact", action="store_true",
+                        help="записувати ходи рядком літер U, D, L, R (див. replay.py)")
+    parser.add_argument("--cache", help="база sqlite кешу розв'язків, спільна для запусків")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--algorithm", choices=Solver.ALGORITHMS, default="astar")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    parser.add_argument("--weight", type=float, default=None,
+                        help="вага евристики для 'weighted' та початкова вага для 'arastar'")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        results = solve_many(read_boards(source), args.workers, not args.unordered, args.size,
+                             args.algorithm, args.heuristic, args.timeout, args.cache, args.weight)
+        for result in results:
+            if args.compact and result["moves"] is not None:
+                result["moves"] = encode(result["moves"])
+            output.write(json.dumps(result, ensure_ascii=False, allow_nan=False) + "\n")
+            output.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
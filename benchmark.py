@@ -0,0 +1,407 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from game import Game
+from heapq import heappop, heappush
+
+from solver import HEURISTICS, BucketQueue, LinearConflict, Manhattan, Node, Puzzle, Solver, pack, successors
+
+try:
+    import resource  # Доступний лише на Unix-системах
+except ImportError:
+    resource = None
+
+# Фіксований набір дошок у форматі "board.txt" (16 чисел через пробіл)
+# з різною довжиною оптимального розв'язку
+BOARDS = [
+    "5 2 1 3 9 10 6 4 13 15 7 8 14 0 12 11",
+    "1 10 2 6 5 4 0 7 9 14 15 3 13 11 12 8",
+    "5 3 1 4 6 14 2 8 7 15 11 0 13 9 10 12",
+    "2 6 11 4 1 3 15 10 5 14 8 7 9 13 0 12",
+    "1 2 4 8 13 3 0 5 14 7 6 11 15 9 12 10",
+    "6 10 2 8 1 3 0 11 15 9 5 12 13 14 4 7",
+    "5 1 3 8 9 15 6 7 13 2 14 0 11 10 12 4",
+]
+
+
+def peak_rss_kb():
+    #Пікове використання пам'яті процесом у кілобайтах (None, якщо невідомо)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_one(board_str, size=4, algorithm="astar", heuristic="manhattan"):
+    #Розв'язує одну дошку і повертає рядок з результатами вимірювання
+    puzzle = Puzzle.from_string(board_str, size)
+    solver = Solver(puzzle, algorithm, heuristic)
+
+    tic = time.perf_counter()
+    path = solver.solve()
+    toc = time.perf_counter()
+
+    steps = len(list(path)) - 1 if path is not None else 0
+    elapsed = toc - tic
+    nodes_per_sec = solver.expanded / elapsed if elapsed > 0 else 0
+    return "%d %d %.3f %.0f %s" % (steps, solver.expanded, elapsed, nodes_per_sec, peak_rss_kb())
+
+
+def run_successors(board_str, size=4, repeat=100000):
+    #Вимірює пропускну здатність генерації сусідніх станів (станів за секунду)
+    #для кожного з трьох способів: 'Puzzle.actions', 'Node.children', 'successors'
+    puzzle = Puzzle.from_string(board_str, size)
+    node = Node.from_puzzle(puzzle)
+    state, blank = node.state, node.blank
+
+    def via_actions():
+        return [move() for move, _ in puzzle.actions]
+
+    def via_children():
+        return node.children()
+
+    def via_successors():
+        return list(successors(state, blank, size))
+
+    results = []
+    for name, generate in (("Puzzle.actions", via_actions), ("Node.children", via_children),
+                           ("successors", via_successors)):
+        count = 0
+        tic = time.perf_counter()
+        for _ in range(repeat):
+            count += len(generate())
+        toc = time.perf_counter()
+        results.append((name, count / (toc - tic)))
+    return results
+
+
+def run_queues(board_str, size=4, count=200000, repeat=3):
+    #Порівнює відкриті списки А*: heapq з кортежами (score, Node) і BucketQueue.
+    #Вузли - стани пошуку в ширину від дошки; на кожне виймання припадає
+    #три додавання, як при розкритті вузла. Повертає пари (назва, виймань/с)
+    node = Node.from_puzzle(Puzzle.from_string(board_str, size))
+    nodes, layer = [], [node]
+    while len(nodes) < count:
+        layer = [child for parent in layer for child in parent.children()]
+        nodes.extend(layer)
+    nodes = nodes[:count]
+
+    def via_heapq():
+        open_list = []
+        for i, child in enumerate(nodes):
+            heappush(open_list, (child.score, child))
+            if i % 3 == 2:
+                heappop(open_list)
+        while open_list:
+            heappop(open_list)
+
+    def via_buckets():
+        open_list = BucketQueue()
+        for i, child in enumerate(nodes):
+            open_list.push(child.g + child.h, child.g, child)
+            if i % 3 == 2:
+                open_list.pop()
+        while open_list:
+            open_list.pop()
+
+    results = []
+    for name, run in (("heapq", via_heapq), ("BucketQueue", via_buckets)):
+        best = min(timed(run) for _ in range(repeat))
+        results.append((name, len(nodes) / best))
+    return results
+
+
+def timed(function):
+    tic = time.perf_counter()
+    function()
+    return time.perf_counter() - tic
+
+
+# Набір дошок для '--suite', згрупованих за довжиною оптимального розв'язку
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_corpus.json")
+
+# Допустиме погіршення метрики відносно базових результатів (частка)
+THRESHOLD = 0.2
+
+# Найменша тривалість одного вимірювання в секундах; коротші вимірювання
+# надто чутливі до шуму
+MIN_TIME = 0.2
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_bucket(size, boards, algorithm="astar", heuristic="manhattan"):
+    #Розв'язує групу дошок і повертає словник метрик групи; викликається
+    #в окремому процесі (див. 'suite_solve'), щоб 'peak_rss_kb' стосувався лише її.
+    #Легкі групи розв'язуються по колу, доки не набереться MIN_TIME секунд,
+    #'time' і 'expanded' наводяться за один прохід групою
+    expanded, elapsed, passes = 0, 0.0, 0
+    while elapsed < MIN_TIME:
+        for board_str in boards:
+            solver = Solver(Puzzle.from_string(board_str, size), algorithm, heuristic)
+            tic = time.perf_counter()
+            solver.solve()
+            elapsed += time.perf_counter() - tic
+            expanded += solver.expanded
+        passes += 1
+    return {"time": elapsed / passes, "expanded": expanded // passes,
+            "nodes_per_sec": expanded / elapsed, "peak_rss_kb": peak_rss_kb()}
+
+
+def suite_solve(corpus, algorithm, heuristic, repeat):
+    #Метрики розв'язання для кожної групи корпусу: найкращий час з 'repeat'
+    #запусків і найменший пік пам'яті. Ключ групи - "розмір/глибина"
+    results = {}
+    for size, buckets in corpus["boards"].items():
+        for depth, boards in buckets.items():
+            runs = []
+            for _ in range(repeat):
+                out = subprocess.run([sys.executable, __file__, "--bucket", size, depth,
+                                      "--algorithm", algorithm, "--heuristic", heuristic],
+                                     capture_output=True, text=True, check=True).stdout
+                runs.append(json.loads(out))
+            best = min(runs, key=lambda run: run["time"])
+            if all(run["peak_rss_kb"] is not None for run in runs):
+                best["peak_rss_kb"] = min(run["peak_rss_kb"] for run in runs)
+            results["%s/%s" % (size, depth)] = best
+    return results
+
+
+def rate(function, items, repeat):
+    #Найбільша з 'repeat' вимірювань кількість викликів 'function' за секунду
+    best = 0.0
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        for item in items:
+            function(item)
+        toc = time.perf_counter()
+        best = max(best, len(items) / (toc - tic))
+    return best
+
+
+def suite_micro(corpus, repeat, rounds=20000):
+    #Пропускна здатність гарячих функцій на дошках 15-пазлу з корпусу (викликів/с)
+    size = 4
+    boards = [board_str for group in corpus["boards"][str(size)].values() for board_str in group]
+    puzzles = [Puzzle.from_string(board_str, size) for board_str in boards] * (rounds // len(boards) + 1)
+    states = [(pack(list(puzzle), size), list(puzzle).index(0)) for puzzle in puzzles]
+    manhattan, linear_conflict = Manhattan(size), LinearConflict(size)
+
+    game = Game(size)
+    directions = random.Random(0).choices(('up', 'down', 'left', 'right'), k=rounds * 10)
+    results = {
+        "successors": rate(lambda item: list(successors(item[0], item[1], size)), states, repeat),
+        "puzzle_actions": rate(lambda puzzle: [move() for move, _ in puzzle.actions], puzzles, repeat),
+        "puzzle_manhattan": rate(lambda puzzle: puzzle.manhattan, puzzles, repeat),
+        "heuristic_manhattan": rate(lambda item: manhattan(item[0]), states, repeat),
+        "heuristic_linear_conflict": rate(lambda item: linear_conflict(item[0]), states, repeat),
+        "game_move": rate(game.move, directions, repeat),
+        "is_solvable": rate(Game.is_solvable, puzzles, repeat),
+    }
+    try:
+        import validation
+    except ImportError:  # Пакетна перевірка потребує numpy
+        return results
+    batch = [list(puzzle) for puzzle in puzzles]
+    results["solvable_mask"] = rate(lambda _: validation.solvable_mask(batch, size), [None], repeat) * len(batch)
+    return results
+
+
+def run_suite(corpus, algorithm="astar", heuristic="manhattan", repeat=3):
+    return {
+        "corpus_version": corpus["version"],
+        "algorithm": algorithm,
+        "heuristic": heuristic,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "solve": suite_solve(corpus, algorithm, heuristic, repeat),
+        "micro": suite_micro(corpus, repeat),
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    #Порівнює результати з базовими і повертає список рядків з погіршеннями
+    #більше ніж на 'threshold': час і пам'ять розв'язання не мають рости,
+    #пропускна здатність - падати. Зміна кількості розкритих вузлів
+    #означає зміну самого пошуку і теж вважається регресією, якщо вона зросла
+    regressions = []
+    if baseline.get("corpus_version") != results["corpus_version"]:
+        return ["версія корпусу %s не збігається з базовою %s"
+                % (results["corpus_version"], baseline.get("corpus_version"))]
+
+    def check(name, value, base, higher_is_better):
+        if base is None or value is None or base == 0:
+            return
+        change = value / base - 1
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append("%-40s %12.4g -> %12.4g (%+.0f%%)" % (name, base, value, change * 100))
+
+    for key, metrics in results["solve"].items():
+        base = baseline.get("solve", {}).get(key)
+        if base is None:
+            continue
+        for metric in ("time", "peak_rss_kb", "expanded"):
+            check("solve %s %s" % (key, metric), metrics.get(metric), base.get(metric), False)
+    for name, value in results["micro"].items():
+        check(name, value, baseline.get("micro", {}).get(name), True)
+    return regressions
+
+
+# Складна дошка (58 ходів) для вимірювання масштабування паралельного пошуку
+PARALLEL_BOARD = "14 12 2 1 4 0 8 13 15 5 11 10 6 9 7 3"
+PARALLEL_WORKERS = (1, 2, 4, 8)
+
+
+def run_parallel(board_str, size=4, heuristic="pdb", workers=PARALLEL_WORKERS):
+    #Розв'язує дошку послідовним IDA* і паралельним ("parallel") з різною
+    #кількістю процесів; повертає список (назва, довжина, розкрито, час, с).
+    #Час паралельного пошуку включає запуск процесів пулу
+    puzzle = Puzzle.from_string(board_str, size)
+    runs = [("idastar", Solver(puzzle, "idastar", heuristic))]
+    runs += [("parallel x%d" % count, Solver(puzzle, "parallel", heuristic, workers=count)) for count in workers]
+    results = []
+    for name, solver in runs:
+        tic = time.perf_counter()
+        length = len(list(solver.solve())) - 1
+        results.append((name, length, solver.expanded, time.perf_counter() - tic))
+    return results
+
+
+# Найбільший допустимий час холодного старту консольного розв'язувача, с
+STARTUP_LIMIT = 0.1
+
+
+def run_startup(repeat=10):
+    #Медіанний час (с) повного запуску окремого процесу: порожнього
+    #інтерпретатора, 'cli.py validate' і 'cli.py solve' на розв'язаній за
+    #один хід дошці, тобто переважно час старту та імпортів
+    here = os.path.dirname(os.path.abspath(__file__))
+    cli = os.path.join(here, "cli.py")
+    board = "1 2 3 4 5 6 7 8 9 10 11 12 13 14 0 15"
+    commands = [
+        ("python", [sys.executable, "-c", "pass"]),
+        ("cli.py validate", [sys.executable, cli, "validate", board]),
+        ("cli.py solve", [sys.executable, cli, "solve", board]),
+    ]
+    results = []
+    for name, command in commands:
+        times = []
+        for _ in range(repeat):
+            tic = time.perf_counter()
+            subprocess.run(command, capture_output=True, check=True, cwd=here)
+            times.append(time.perf_counter() - tic)
+        results.append((name, sorted(times)[len(times) // 2]))
+    return results
+
+
+def print_suite(results):
+    print("%-10s %9s %10s %10s %10s" % ("bucket", "time, s", "expanded", "nodes/s", "peak, KB"))
+    for key, metrics in results["solve"].items():
+        print("%-10s %9.3f %10d %10.0f %10s" % (key, metrics["time"], metrics["expanded"],
+                                              metrics["nodes_per_sec"], metrics["peak_rss_kb"]))
+    print()
+    for name, value in results["micro"].items():
+        print("%-26s %12.0f /s" % (name, value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк розв'язувача головоломки")
+    parser.add_argument("--one", help="розв'язати одну дошку в поточному процесі")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--algorithm", choices=Solver.ALGORITHMS, default="astar")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    parser.add_argument("--successors", action="store_true",
+                        help="виміряти швидкість генерації сусідніх станів")
+    parser.add_argument("--queues", action="store_true",
+                        help="порівняти швидкість відкритих списків heapq і BucketQueue")
+    parser.add_argument("--suite", action="store_true",
+                        help="виміряти набір метрик на корпусі дошок (див. --corpus)")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="файл корпусу дошок")
+    parser.add_argument("--repeat", type=int, default=3, help="кількість повторів кожного вимірювання")
+    parser.add_argument("--save", help="записати результати '--suite' у файл JSON")
+    parser.add_argument("--baseline", help="файл базових результатів '--suite' для порівняння")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="допустиме погіршення метрики (частка), більше - код виходу 1")
+    parser.add_argument("--parallel", nargs="?", const=PARALLEL_BOARD, metavar="BOARD",
+                        help="виміряти масштабування паралельного пошуку на 1/2/4/8 процесах (евристика pdb)")
+    parser.add_argument("--startup", action="store_true",
+                        help="виміряти холодний старт консольного розв'язувача (cli.py)")
+    parser.add_argument("--bucket", nargs=2, metavar=("SIZE", "DEPTH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.bucket:
+        size, depth = args.bucket
+        boards = load_corpus(args.corpus)["boards"][size][depth]
+        print(json.dumps(run_bucket(int(size), boards, args.algorithm, args.heuristic)))
+        return
+
+    if args.suite:
+        results = run_suite(load_corpus(args.corpus), args.algorithm, args.heuristic, args.repeat)
+        print_suite(results)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(results, json.load(f), args.threshold)
+            if regressions:
+                print("\nРегресії відносно %s:" % args.baseline)
+                for line in regressions:
+                    print(line)
+                sys.exit(1)
+            print("\nРегресій відносно %s немає" % args.baseline)
+        return
+
+    if args.parallel:
+        results = run_parallel(args.parallel, args.size)
+        base = results[1][3]
+        print("%-12s %6s %10s %9s %8s" % ("search", "steps", "expanded", "time, s", "speedup"))
+        for name, length, expanded, elapsed in results:
+            print("%-12s %6d %10d %9.2f %8.2f" % (name, length, expanded, elapsed, base / elapsed))
+        print("(ядер: %d)" % os.cpu_count())
+        return
+
+    if args.startup:
+        results = run_startup(max(args.repeat, 10))
+        for name, elapsed in results:
+            print("%-16s %8.1f ms" % (name, elapsed * 1000))
+        if results[-1][1] > STARTUP_LIMIT:
+            print("Холодний старт довший за %.0f мс" % (STARTUP_LIMIT * 1000))
+            sys.exit(1)
+        return
+
+    if args.queues:
+        for name, pops_per_sec in run_queues(BOARDS[-1], args.size):
+            print("%-16s %12.0f pops/s" % (name, pops_per_sec))
+        return
+
+    if args.successors:
+        for name, rate in run_successors(BOARDS[0], args.size):
+            print("%-16s %12.0f states/s" % (name, rate))
+        return
+
+    if args.one:
+        print(run_one(args.one, args.size, args.algorithm, args.heuristic))
+        return
+
+    # Кожна дошка розв'язується в окремому процесі, щоб пікове
+    # використання пам'яті не накопичувалось між запусками
+    print("%-40s %6s %9s %9s %10s %10s" % ("board", "steps", "expanded", "time, s", "nodes/s", "peak, KB"))
+    for board_str in BOARDS:
+        out = subprocess.run([sys.executable, __file__, "--one", board_str, "--size", str(args.size),
+                              "--algorithm", args.algorithm, "--heuristic", args.heuristic],
+                             capture_output=True, text=True, check=True).stdout.split()
+        steps, expanded, elapsed, nodes_per_sec, rss = out
+        print("%-40s %6s %9s %9s %10s %10s" % (board_str, steps, expanded, elapsed, nodes_per_sec, rss))
+
+
+if __name__ == "__main__":
+    main()
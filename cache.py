@@ -0,0 +1,135 @@
+from collections import OrderedDict
+
+from solver import pack
+
+# Компактний запис дій тайлу '0' однією літерою
+CODES = {'up': 'U', 'down': 'D', 'left': 'L', 'right': 'R'}
+ACTIONS = {code: action for action, code in CODES.items()}
+
+# Транспонування дошки міняє місцями вертикальні та горизонтальні ходи
+TRANSPOSED = str.maketrans("UDLR", "LRUD")
+
+_transposes = {}
+
+
+def transpose_tables(width):
+    #Повертає (source, relabel) для транспонування дошки ширини 'width':
+    #тайл на позиції 'pos' береться з позиції 'source[pos]' і отримує номер
+    #'relabel[tile]' - номер тайлу, ціль якого є транспонованою ціллю 'tile'.
+    #Розв'язаний стан при цьому переходить сам у себе
+    if width not in _transposes:
+        size = width * width
+        source = [(pos % width) * width + pos // width for pos in range(size)]
+        relabel = [0] + [source[tile - 1] + 1 for tile in range(1, size)]
+        _transposes[width] = (source, relabel)
+    return _transposes[width]
+
+
+def transpose(tiles, width):
+    #Повертає плоский список тайлів транспонованої дошки
+    source, relabel = transpose_tables(width)
+    return [relabel[tiles[pos]] for pos in source]
+
+
+def canonical(tiles, width):
+    #Повертає (ключ, transposed) для плоского списку тайлів: ключ - менший
+    #із запакованих станів дошки та її транспонованої копії, 'transposed'
+    #вказує, чи ключ отримано з транспонованої копії
+    state = pack(tiles, width)
+    mirrored = pack(transpose(tiles, width), width)
+    if mirrored < state:
+        return mirrored, True
+    return state, False
+
+
+class SolutionCache:
+    #Кеш розв'язків перед Solver.solve().
+    #- 'capacity' - максимальна кількість станів у пам'яті (витіснення LRU)
+    #- 'path' - файл бази sqlite для збереження між запусками, якщо є
+    #Кожен стан на шляху закешованого розв'язку теж стає ключем кешу, тож
+    #запит будь-якого з них повертає залишок шляху. Ключі нормалізовані
+    #щодо транспонування, ходи зберігаються у напрямку канонічної дошки
+
+    def __init__(self, capacity=100000, path=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()  # (ширина, ключ) -> (рядок ходів, зсув)
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            import sqlite3  # Лише для кешу з базою: швидший старт без неї
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT)")
+            self.db.commit()
+
+    def get(self, puzzle):
+        #Повертає список дій, що розв'язують 'puzzle', або None
+        width = puzzle.width
+        key, transposed = canonical(list(puzzle), width)
+
+        moves = None
+        entry = self.entries.get((width, key))
+        if entry is not None:
+            self.entries.move_to_end((width, key))
+            codes, offset = entry
+            moves = codes[offset:]
+        elif self.db is not None:
+            row = self.db.execute("SELECT moves FROM solutions WHERE key = ?",
+                                  ("%d:%x" % (width, key),)).fetchone()
+            if row is not None:
+                moves = row[0]
+                self.remember(width, key, moves, 0)
+
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if transposed:
+            moves = moves.translate(TRANSPOSED)
+        return [ACTIONS[code] for code in moves]
+
+    def put(self, puzzle, actions):
+        #Запам'ятовує розв'язок 'actions' для 'puzzle' та всіх станів на його шляху
+        width = puzzle.width
+        codes = "".join(CODES[action] for action in actions)
+        mirrored = codes.translate(TRANSPOSED)
+        offsets = {'U': -width, 'D': width, 'L': -1, 'R': 1}
+
+        tiles = list(puzzle)
+        blank = tiles.index(0)
+        rows = []
+        for offset in range(len(codes)):
+            key, transposed = canonical(tiles, width)
+            self.remember(width, key, mirrored if transposed else codes, offset)
+            if self.db is not None:
+                rows.append(("%d:%x" % (width, key), (mirrored if transposed else codes)[offset:]))
+
+            to = blank + offsets[codes[offset]]
+            tiles[blank], tiles[to] = tiles[to], 0
+            blank = to
+
+        if self.db is not None:
+            self.db.executemany("INSERT INTO solutions (key, moves) VALUES (?, ?) "
+                                "ON CONFLICT(key) DO UPDATE SET moves = excluded.moves "
+                                "WHERE length(excluded.moves) < length(solutions.moves)", rows)
+            self.db.commit()
+
+    def remember(self, width, key, codes, offset):
+        #Додає запис у пам'ять, не замінюючи коротший розв'язок того ж стану
+        entry = self.entries.get((width, key))
+        if entry is not None and len(entry[0]) - entry[1] <= len(codes) - offset:
+            self.entries.move_to_end((width, key))
+            return
+        self.entries[width, key] = (codes, offset)
+        self.entries.move_to_end((width, key))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __len__(self):
+        return len(self.entries)
+
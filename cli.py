@@ -0,0 +1,97 @@
+import argparse
+import sys
+
+from game import Game, is_valid_board
+from solver import HEURISTICS, Puzzle, SearchLimit, Solver
+
+# Легкий консольний інтерфейс без pygame:
+#   python cli.py solve [дошка] - розв'язати дошку і вивести рядок ходів
+#   python cli.py validate [дошка] - перевірити дошку
+# Дошка - числа через пробіл, '-' для стандартного вводу або за замовчуванням
+# board.txt; ширина визначається кількістю чисел. Імпортуються лише
+# 'solver' і 'game', таблиці евристик читаються лише для '--heuristic pdb'
+
+# Коди виходу
+OK, INVALID, UNSOLVABLE, LIMIT, ERROR = 0, 1, 2, 3, 4
+
+
+def read_puzzle(board):
+    #Повертає Puzzle з рядка, файлу board.txt або stdin, або None для
+    #дошки, що не є перестановкою чисел 0..n*n-1
+    if board is None:
+        with open("board.txt") as f:
+            board = f.read()
+    elif board == "-":
+        board = sys.stdin.read()
+    numbers = board.split()
+    size = int(len(numbers) ** 0.5)
+    if size < 2 or size * size != len(numbers):
+        return None
+    puzzle = Puzzle.from_string(board, size)
+    if puzzle is None or not is_valid_board(puzzle.board, size):
+        return None
+    return puzzle
+
+
+def solve(args):
+    puzzle = read_puzzle(args.board)
+    if puzzle is None:
+        print("Некоректна дошка", file=sys.stderr)
+        return INVALID
+    if not Game.is_solvable(puzzle):
+        print("Дошка не має розв'язку", file=sys.stderr)
+        return UNSOLVABLE
+
+    try:
+        solver = Solver(puzzle, args.algorithm, args.heuristic, args.timeout, weight=args.weight)
+        path = solver.solve()
+    except SearchLimit as error:
+        print("Пошук перервано: %s" % type(error).__name__, file=sys.stderr)
+        return LIMIT
+    except Exception as error:  # Наприклад, відсутній файл таблиць "pdb" або завелика дошка для "bounded"
+        print("%s: %s" % (type(error).__name__, error), file=sys.stderr)
+        return ERROR
+    from replay import encode
+    moves = encode([node.action for node in path][1:]) if path is not None else ""
+    print(moves)
+    if args.verbose:
+        print("%d ходів, розкрито %d вузлів, %.3f с" % (len(moves), solver.expanded, solver.elapsed),
+              file=sys.stderr)
+    return OK
+
+
+def validate(args):
+    puzzle = read_puzzle(args.board)
+    if puzzle is None:
+        print("invalid")
+        return INVALID
+    if not Game.is_solvable(puzzle):
+        print("unsolvable")
+        return UNSOLVABLE
+    print("solvable")
+    return OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Консольний розв'язувач гри у п'ятнашки (без графічного інтерфейсу)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve_parser = commands.add_parser("solve", help="розв'язати дошку і вивести рядок ходів тайлу '0'")
+    solve_parser.add_argument("board", nargs="?", help="дошка (числа через пробіл) або '-'; за замовчуванням board.txt")
+    solve_parser.add_argument("--algorithm", choices=Solver.ALGORITHMS, default="astar")
+    solve_parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    solve_parser.add_argument("--timeout", type=float, default=None, help="обмеження часу, с")
+    solve_parser.add_argument("--weight", type=float, default=None, help="вага евристики для 'weighted'")
+    solve_parser.add_argument("-v", "--verbose", action="store_true", help="вивести статистику пошуку в stderr")
+    solve_parser.set_defaults(run=solve)
+
+    validate_parser = commands.add_parser("validate", help="перевірити коректність і розв'язність дошки")
+    validate_parser.add_argument("board", nargs="?", help="дошка (числа через пробіл) або '-'; за замовчуванням board.txt")
+    validate_parser.set_defaults(run=validate)
+
+    args = parser.parse_args()
+    sys.exit(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
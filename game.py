@@ -1,6 +1,9 @@
 import random
 from solver import Puzzle
 
+# Допустима кількість пазлів у рядку дошки
+MIN_SIZE, MAX_SIZE = 3, 8
+
 
 class Game:
     def __init__(self, size=4, shuffle_steps=1000):
@@ -12,21 +15,11 @@ class Game:
         self.moves = 0
         self.shuffle_steps = shuffle_steps
 
-    def is_solvable(self, puzzle):
+    @staticmethod
+    def is_solvable(puzzle):
         flatten_puzzle = [number for row in puzzle.board for number in row]  # Конвертуємо головоломку в список
-        inversions = 0  # Кількість інверсій
-        empty_row = 0  # Рядок порожньої плитки
-
-        # Підраховуємо інверсії та знаходимо рядок порожньої плитки
-        for i in range(len(flatten_puzzle)):
-            if flatten_puzzle[i] == 0:  # Знаходимо порожню плитку
-                empty_row = puzzle.width - i // puzzle.width  # Обчислюємо рядок порожньої плитки
-                continue
-            for j in range(i + 1, len(flatten_puzzle)):
-                if flatten_puzzle[j] == 0:  # Пропускаємо порожню плитку
-                    continue
-                if flatten_puzzle[j] < flatten_puzzle[i]:
-                    inversions += 1
+        inversions = count_inversions([number for number in flatten_puzzle if number != 0])  # Кількість інверсій
+        empty_row = puzzle.width - flatten_puzzle.index(0) // puzzle.width  # Рядок порожньої плитки (знизу)
 
         # Перевіряємо умову розв'язності на основі кількості інверсій та рядка порожньої плитки
         if puzzle.width % 2 == 1:  # Для головоломок з непарною шириною
@@ -126,6 +119,18 @@ def read_board_from_file(file_path, size):
         return None
 
 
+def read_board_size(file_path):
+    # Повертає кількість пазлів у рядку дошки з файлу (None, якщо файл
+    # не містить квадратної дошки)
+    try:
+        with open(file_path, 'r') as file:
+            count = len(file.read().split())
+    except IOError:
+        return None
+    size = int(count ** 0.5)
+    return size if size > 1 and size * size == count else None
+
+
 def save_board_to_file(board, file_path):
     try:
         with open(file_path, 'w') as file:
@@ -142,14 +147,30 @@ def is_valid_board(board, size):
     if len(board) != size or any(len(row) != size for row in board):
         return False
 
-    # Створення множини чисел, які повинні бути на дошці
-    numbers = set(range(0, size * size + 1))  # +1 для підтримки двозначних чисел
-
-    # Перевірка наявності чисел на дошці без повторень
-    found_numbers = set()
+    # Дошка повинна містити кожне число від 0 до size * size - 1 рівно один раз
+    found_numbers = [False] * (size * size)
     for row in board:
         for num in row:
-            if num in found_numbers or num not in numbers:
+            if not 0 <= num < size * size or found_numbers[num]:
                 return False
-            found_numbers.add(num)
+            found_numbers[num] = True
     return True
+
+
+def count_inversions(numbers):
+    # Кількість пар i < j з numbers[i] > numbers[j] за O(n log n) за допомогою
+    # дерева Фенвіка (BIT); 'numbers' - різні числа від 1 до len(numbers)
+    tree = [0] * (len(numbers) + 1)
+    inversions = 0
+    for seen, number in enumerate(numbers):
+        # Кількість уже переглянутих чисел, не більших за 'number'
+        i, smaller = number, 0
+        while i > 0:
+            smaller += tree[i]
+            i -= i & -i
+        inversions += seen - smaller
+        i = number
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+    return inversions
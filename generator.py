@@ -0,0 +1,140 @@
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from solver import goal_state, move_table, successors, unpack
+
+# Напрямки ходу тайлу '0', нумерація яких використовується у 'walk_tables'
+DIRECTIONS = ('up', 'left', 'right', 'down')
+
+# Стовпець напрямку, що скасовує кожен із напрямків (up <-> down, left <-> right)
+OPPOSITE = (3, 2, 1, 0)
+
+# Розмір партії дошок, що перемішуються одночасно
+BATCH = 65536
+
+
+def walk_tables(width):
+    #Таблиці ходів без повернень, індексовані ключем blank * 5 + previous + 1,
+    #де 'previous' - стовпець попереднього напрямку DIRECTIONS або -1:
+    #- 'counts' - кількість дозволених ходів
+    #- 'targets', 'directions' - (ключ, 3): позиції, куди переходить тайл '0',
+    #  та напрямки цих ходів (зайві комірки повторюють перший хід)
+    size = width * width
+    counts = np.zeros(size * 5, dtype=np.intp)
+    targets = np.zeros((size * 5, 3), dtype=np.intp)
+    directions = np.zeros((size * 5, 3), dtype=np.intp)
+    for blank, moves in enumerate(move_table(width)):
+        for previous in range(-1, 4):
+            key = blank * 5 + previous + 1
+            allowed = [(to, DIRECTIONS.index(action)) for to, action in moves
+                       if previous < 0 or DIRECTIONS.index(action) != OPPOSITE[previous]]
+            counts[key] = len(allowed)
+            for k in range(3):
+                targets[key, k], directions[key, k] = allowed[min(k, len(allowed) - 1)]
+    return counts, targets, directions
+
+
+def random_walks(count, depth, width, rng):
+    #Повертає масив (count, width * width) дошок, отриманих з розв'язаної
+    #'depth' випадковими ходами без повернень: хід, що скасовує попередній,
+    #ніколи не обирається. Всі дошки партії перемішуються одночасно
+    size = width * width
+    counts, targets, directions = walk_tables(width)
+    rows = np.arange(count)
+
+    boards = np.tile(np.append(np.arange(1, size), 0).astype(np.int16), (count, 1))
+    blank = np.full(count, size - 1, dtype=np.intp)
+    key = blank * 5
+
+    for _ in range(depth):
+        # Рівномірний вибір серед дозволених ходів
+        choice = (rng.random(count) * counts[key]).astype(np.intp)
+        to = targets[key, choice]
+        boards[rows, blank] = boards[rows, to]
+        boards[rows, to] = 0
+        key = to * 5 + directions[key, choice] + 1
+        blank = to
+    return boards
+
+
+def exact_layer(width, depth):
+    #Повертає відсортований список запакованих станів, оптимальна відстань
+    #яких до розв'язаного рівно 'depth' (пошук у ширину шар за шаром).
+    #Розмір шару зростає приблизно у 2 рази на хід, тож це практично лише
+    #для невеликих глибин. Шар порожній, якщо 'depth' більша за найбільшу
+    #оптимальну відстань на дошці
+    goal = goal_state(width)
+    blank = width * width - 1
+    previous, layer = {}, {goal: blank}
+    for _ in range(depth):
+        following = {}
+        for state, position in layer.items():
+            for child, to, _ in successors(state, position, width):
+                if child not in layer and child not in previous and child not in following:
+                    following[child] = to
+        previous, layer = layer, following
+        if not layer:
+            break
+    return sorted(layer)
+
+
+def format_board(tiles, labels):
+    return " ".join([labels[tile] for tile in tiles])
+
+
+def generate(count, depth, width=4, seed=None, exact=False):
+    #Генерує рядки з дошками у форматі 'Puzzle.from_string'. Однакові
+    #аргументи і 'seed' дають однакову послідовність дошок
+    labels = [str(tile) for tile in range(width * width)]
+    if exact:
+        layer = exact_layer(width, depth)
+        if not layer:
+            raise ValueError("Немає дошок з оптимальним розв'язком рівно %d ходів" % depth)
+        picker = random.Random(seed)
+        for _ in range(count):
+            yield format_board(unpack(picker.choice(layer), width), labels)
+        return
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, BATCH):
+        boards = random_walks(min(BATCH, count - start), depth, width, rng)
+        for tiles in boards.tolist():
+            yield format_board(tiles, labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерація перемішаних дошок (одна дошка на рядок)")
+    parser.add_argument("--count", type=int, default=1000, help="кількість дошок")
+    parser.add_argument("--depth", type=int, default=40, help="довжина випадкового перемішування")
+    parser.add_argument("--exact", action="store_true",
+                        help="обирати лише дошки з оптимальним розв'язком рівно '--depth' ходів")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", help="файл результату (за замовчуванням stdout)")
+    args = parser.parse_args()
+
+    tic = time.perf_counter()
+    boards = generate(args.count, args.depth, args.size, args.seed, args.exact)
+    if args.exact:
+        # Шар будується до відкриття файлу результату, тож помилка видна одразу
+        try:
+            boards = list(boards)
+        except ValueError as error:
+            parser.error(str(error))
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for line in boards:
+            output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    toc = time.perf_counter()
+    print("Згенеровано %d дошок, %.0f дошок/с" % (args.count, args.count / (toc - tic)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
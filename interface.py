@@ -1,9 +1,9 @@
 import pygame
-import time
+from collections import deque
 from pygame.locals import *
-from game import Game, save_board_to_file
-from solver import Solver
-import threading
+from background import SolveProcess
+from game import MAX_SIZE, MIN_SIZE, Game, save_board_to_file
+from replay import decode
 
 
 class Button:
@@ -31,107 +31,234 @@ class Button:
 
 
 class GameWindow:
-    TILE_SIZE = 100  # Розмір одного пазла
-    BOARD_SIZE = TILE_SIZE * 4 + 10  # Розмір дошки
+    TILE_SIZE = 100  # Розмір одного пазла на дошці 4x4; на інших дошках масштабується
+    BOARD_SIZE = TILE_SIZE * 4 + 10  # Розмір дошки, однаковий для всіх розмірів гри
+    MIN_SIZE, MAX_SIZE = MIN_SIZE, MAX_SIZE  # Допустима кількість пазлів у рядку
     WINDOW_SIZE = (BOARD_SIZE + 120, BOARD_SIZE + 220)  # Розмір вікна
     FPS = 60  # Кількість кадрів на секунду для оновлення графіки
 
-    def create_tiles(self, board):
-        tiles = []
-        for row in range(len(board.board)):
-            for col in range(len(board.board[row])):
-                tile_rect = pygame.Rect(
-                    col * (self.TILE_SIZE + 7) + 50 + (self.BOARD_SIZE - self.TILE_SIZE  * self.game.size) // 1.5,
-                    row * (self.TILE_SIZE + 7) + 10 + (self.BOARD_SIZE - self.TILE_SIZE  * self.game.size) // 1.5,
-                    self.TILE_SIZE,
-                    self.TILE_SIZE
-                )
-
-                if board.board[row][col] != 0:
-                    tile_surface = pygame.font.Font(None, 36).render(str(board.board[row][col]), True, (255, 255, 255))
-                    tile_color = (255, 178, 102)
-                else:
-                    tile_surface = pygame.Surface((self.TILE_SIZE, self.TILE_SIZE))
-                    tile_surface.fill((128, 128, 128))
-                    tile_color = (0, 0, 0)
-                tiles.append((tile_surface, tile_rect, tile_color))
-        return tiles
-
-    def __init__(self):
-        self.game = Game(size=4)  # Створення об'єкту гри
+    # Алгоритм розв'язувача (див. Solver.ALGORITHMS): "weighted" чи "arastar"
+    # швидше знаходять неоптимальний розв'язок; для "arastar" SOLVE_TIME_LIMIT -
+    # бюджет покращення, а кнопка "Cancel" показує найкращий знайдений розв'язок
+    SOLVE_ALGORITHM = "astar"
+    # Для дошок, більших за OPTIMAL_MAX_SIZE, оптимальний пошук надто повільний,
+    # тож вони розв'язуються алгоритмом SOLVE_LARGE_ALGORITHM
+    OPTIMAL_MAX_SIZE = 4
+    SOLVE_LARGE_ALGORITHM = "reduction"
+    SOLVE_HEURISTIC = "manhattan"  # Евристика розв'язувача (див. solver.HEURISTICS)
+    SOLVE_WEIGHT = None  # Вага евристики для "weighted" і "arastar" (None - за замовчуванням Solver)
+    SOLVE_TIME_LIMIT = 120  # Обмеження часу пошуку розв'язку, с
+    SOLVE_NODE_LIMIT = 5000000  # Обмеження кількості розкритих вузлів
+    ANIMATION_DELAY = 100  # Затримка між ходами анімації розв'язку, мс
+    ANIMATION_TIME = 20000  # Найбільша тривалість анімації довгого розв'язку, мс
+
+    BACKGROUND_COLOR = (0, 150, 150)  # Колір фону вікна
+    STATUS_CENTER_OFFSET = 170  # Відступ центру повідомлення від низу дошки
+
+    def tile_rect(self, row, col):
+        return pygame.Rect(
+            col * (self.tile_size + 7) + 50 + (self.BOARD_SIZE - self.tile_size * self.size) // 1.5,
+            row * (self.tile_size + 7) + 10 + (self.BOARD_SIZE - self.tile_size * self.size) // 1.5,
+            self.tile_size,
+            self.tile_size
+        )
+
+    def render_tile(self, number):
+        # Повертає готову поверхню плитки з номером 'number' (0 - порожня плитка);
+        # поверхні рендеряться один раз для кожного номера і розміру плитки
+        key = (number, self.tile_size)
+        if key not in self.tile_cache:
+            surface = pygame.Surface((self.tile_size, self.tile_size))
+            if number != 0:
+                surface.fill((255, 178, 102))
+                text = self.tile_font.render(str(number), True, (255, 255, 255))
+                surface.blit(text, text.get_rect(center=surface.get_rect().center))
+            else:
+                surface.fill((128, 128, 128))
+            self.tile_cache[key] = surface
+        return self.tile_cache[key]
+
+    def render_status(self, text, cache=True):
+        # Повертає поверхню повідомлення 'text'; постійні повідомлення ('cache')
+        # рендеряться один раз, а змінні (прогрес пошуку) - при кожній зміні
+        if not cache:
+            return self.status_font.render(text, True, (0, 0, 0))
+        if text not in self.status_cache:
+            self.status_cache[text] = self.status_font.render(text, True, (0, 0, 0))
+        return self.status_cache[text]
+
+    def __init__(self, size=4):
+        if not self.MIN_SIZE <= size <= self.MAX_SIZE:
+            raise ValueError("Розмір дошки має бути від %d до %d" % (self.MIN_SIZE, self.MAX_SIZE))
+        self.size = size  # Кількість пазлів у рядку
+        self.tile_size = self.TILE_SIZE * 4 // size  # Розмір одного пазла
+        self.game = Game(size=size)  # Створення об'єкту гри
         self.board = self.game.puzzle  # Отримання початкової дошки гри
         self.empty_row = self.game.empty_row  # Рядок порожньої плитки
         self.empty_col = self.game.empty_col  # Стовпець порожньої плитки
         self.font = pygame.font.SysFont('arial', 40)  # Шрифт для тексту на плитках
-        self.tiles = self.create_tiles(self.board)  # Створення плиток для відображення на дошці
+        self.tile_font = pygame.font.Font(None, 36 * 4 // max(size, 4))  # Шрифт номерів плиток
+        self.status_font = pygame.font.Font(None, 48)  # Шрифт повідомлень під дошкою
+        self.tile_cache = {}  # (номер, розмір плитки) -> поверхня плитки
+        self.status_cache = {}  # Текст повідомлення -> поверхня
+        self.status_rect = pygame.Rect(0, self.BOARD_SIZE + self.STATUS_CENTER_OFFSET - 25, self.WINDOW_SIZE[0], 50)
+        self.status = None  # Поточне повідомлення під дошкою
+        self.shown = None  # Стан дошки, який зараз відображено у вікні
+        self.dirty = []  # Прямокутники вікна, які потрібно оновити на екрані
+        self.full_redraw = True  # Чи потрібно перемалювати все вікно
         self.window = pygame.display.set_mode(self.WINDOW_SIZE)  # Створення вікна гри
-        pygame.display.set_caption("15 Puzzle")  # Встановлення заголовку вікна
+        pygame.display.set_caption("%d Puzzle" % (size * size - 1))  # Встановлення заголовку вікна
         self.buttons = self.create_buttons()  # Створення кнопок
         self.running = True  # Прапорець, що вказує, чи триває гра
-        self.solve_running = False  # Прапорець, що вказує, чи триває робота алгоритму розв'язку
+        self.solve_running = False  # Прапорець, що вказує, чи триває пошук або анімація розв'язку
+        self.solver_process = None  # Процес розв'язувача, поки триває пошук
+        self.progress_text = None  # Останній прогрес пошуку для повідомлення під дошкою
+        self.message = None  # Повідомлення про невдалий пошук
+        self.solution = deque()  # Ходи розв'язку, що ще не показані анімацією
+        self.next_move_at = 0  # Час (мс) наступного ходу анімації
+        self.move_delay = self.ANIMATION_DELAY  # Затримка між ходами поточної анімації, мс
 
     def new_game(self):
-        self.game = Game(size=4, shuffle_steps=40)  # Створення нової гри з перемішаними пазлами
+        self.game = Game(size=self.size, shuffle_steps=40)  # Створення нової гри з перемішаними пазлами
         self.game.shuffle_board()  # Перемішування пазлів на дошці
         self.board = self.game.puzzle  # Отримання нової дошки гри
         self.empty_row = self.game.empty_row  # Оновлення рядка порожньої плитки
         self.empty_col = self.game.empty_col  # Оновлення стовпця порожньої плитки
-        self.tiles = self.create_tiles(self.board)  # Створення плиток для відображення на дошці
-        self.draw_board()  # Оновлення відображення дошки
+        self.message = None
+        self.full_redraw = True  # Нова дошка відображається повністю
 
     def solve_game(self):
+        if self.solver_process is not None:  # Під час пошуку кнопка скасовує його
+            self.solver_process.cancel()
+            return
         if self.solve_running or self.game.is_solved():  # Перевірка, чи алгоритм розв'язку вже працює
             return
 
-        def solve_algorithm():
-            self.solve_running = True  # Встановлення прапорця, що вказує на роботу алгоритму розв'язку
+        self.solve_running = True  # Встановлення прапорця, що вказує на роботу алгоритму розв'язку
+        self.progress_text = None
+        self.message = None
+        # Пошук іде в окремому процесі, тож головний цикл не блокується
+        algorithm = self.SOLVE_ALGORITHM if self.size <= self.OPTIMAL_MAX_SIZE else self.SOLVE_LARGE_ALGORITHM
+        solver_process = SolveProcess(self.board.board, algorithm, self.SOLVE_HEURISTIC,
+                                      self.SOLVE_TIME_LIMIT, self.SOLVE_NODE_LIMIT, self.SOLVE_WEIGHT)
+        solver_process.start()
+        self.solver_process = solver_process
+        self.set_button_text(self.solve_button, "Cancel")
 
-            tic = time.perf_counter()  # Початок відліку часу
-            p = Solver(self.board).solve()  # Запуск алгоритму розв'язку
-            toc = time.perf_counter()  # Кінець відліку часу
-
-            steps = 0
-            for node in p:
-                print(node.action)  # Виведення дії, зробленої алгоритмом
-                node.puzzle.pprint()  # Виведення поточного стану дошки
-                steps += 1
-
-                self.game.move(node.action)  # Застосування дії до гри
-                pygame.display.update()  # Оновлення відображення дошки
-                self.update_tiles()  # Оновлення плиток на дошці
-                pygame.time.wait(100)  # Затримка для плавності відображення
-
-            print("Загальна кількість кроків: " + str(steps))
-            print("Загальний час пошуку: " + str(toc - tic) + " секунд(и)")
+    def handle_solver(self):
+        # Обробляє повідомлення процесу розв'язувача (див. background.solve_worker)
+        if self.solver_process is None:
+            return
+        for message in self.solver_process.poll():
+            kind = message[0]
+            if kind == "progress":
+                _, expanded, bound, elapsed = message
+                self.progress_text = "Nodes: %d  f: %d  %.1f s" % (expanded, bound, elapsed)
+                continue
 
-            self.solve_running = False  # Скидання прапорця, коли алгоритм розв'язку закінчує роботу
+            # ("done", ходи, розкрито, час) або ("failed", причина, розкрито, час)
+            _, result, expanded, elapsed = message
+            self.solver_process = None
+            self.progress_text = None
+            self.set_button_text(self.solve_button, "Solve")
+            if kind == "done":
+                print(result)  # Виведення ходів розв'язку (U, D, L, R - напрямки руху тайлу '0')
+                print("Загальна кількість кроків: " + str(len(result)))
+                print("Загальний час пошуку: " + str(elapsed) + " секунд(и)")
+                self.animate_solution(decode(result))
+            else:
+                print("Пошук зупинено: " + result)
+                self.message = "Solve stopped: " + result
+                self.solve_running = False
 
-        solve_thread = threading.Thread(target=solve_algorithm)  # Створення потоку для алгоритму розв'язку
-        solve_thread.start()  # Запуск потоку
+    def set_button_text(self, button, text):
+        button.text = text
+        button.draw(self.window)
+        self.dirty.append(button.rect)
 
     def quit_game(self):
         self.running = False  # Зупинка гри
 
     def update_tiles(self):
         self.board = self.game.puzzle  # Оновлення дошки гри
-        self.tiles = self.create_tiles(self.board)  # Оновлення плиток на дошці
         self.empty_row = self.game.empty_row  # Оновлення рядка порожньої плитки
         self.empty_col = self.game.empty_col  # Оновлення стовпця порожньої плитки
-        self.draw_board()  # Оновлення відображення дошки
-        pygame.display.update()  # Оновлення вікна
+        self.draw_board()  # Перемальовування плиток, що змінились
+        self.flip()  # Оновлення вікна
 
     def animate_solution(self, solution):
-        for move in solution:
-            self.game.move(move)  # Застосування дії до гри
-            self.update_tiles()  # Оновлення плиток на дошці
-            pygame.time.wait(500)  # Затримка для плавності відображення
+        # Ходи розв'язку показуються головним циклом по одному (див. 'animate_step')
+        self.solution = deque(solution)
+        self.next_move_at = pygame.time.get_ticks()
+        # Довгі розв'язки великих дошок показуються швидше, кілька ходів за кадр
+        self.move_delay = min(self.ANIMATION_DELAY, self.ANIMATION_TIME / max(len(solution), 1))
+        if not self.solution:
+            self.solve_running = False
+
+    def animate_step(self):
+        while self.solution and pygame.time.get_ticks() >= self.next_move_at:
+            self.game.move(self.solution.popleft())  # Застосування дії до гри
+            self.update_tiles()
+            self.next_move_at += self.move_delay  # Затримка для плавності відображення
+            if not self.solution:
+                self.solve_running = False  # Скидання прапорця, коли анімація розв'язку закінчилась
+
+    def draw_tile(self, row, col):
+        rect = self.tile_rect(row, col)
+        self.window.blit(self.render_tile(self.board.board[row][col]), rect)
+        self.dirty.append(rect)
 
     def draw_board(self):
-        self.window.fill((0, 150, 150))  # Заповнення вікна світло-синім кольором
-        for tile in self.tiles:
-            pygame.draw.rect(self.window, tile[2], tile[1])
-            text_rect = tile[0].get_rect(center=tile[1].center)
-            self.window.blit(tile[0], text_rect)  # Відображення тексту на плитці
+        # Перемальовує лише плитки, що змінились з останнього відображення
+        # (після ходу - дві обміняні плитки), або все вікно після 'full_redraw'
+        state = self.game.get_state()
+        if self.full_redraw:
+            self.window.fill(self.BACKGROUND_COLOR)  # Заповнення вікна світло-синім кольором
+            for button in self.buttons:
+                button.draw(self.window)
+            for row in range(self.game.size):
+                for col in range(self.game.size):
+                    self.draw_tile(row, col)
+            self.status = None
+            self.draw_status()
+            self.dirty = [self.window.get_rect()]
+            self.full_redraw = False
+        elif state != self.shown:
+            for row in range(self.game.size):
+                if state[row] != self.shown[row]:
+                    for col in range(self.game.size):
+                        if state[row][col] != self.shown[row][col]:
+                            self.draw_tile(row, col)
+        self.shown = state
+
+    def draw_status(self):
+        # Показує повідомлення під дошкою, якщо воно змінилось
+        cache = True
+        if self.solver_process is not None and self.progress_text is not None:
+            status, cache = self.progress_text, False
+        elif self.solve_running and not self.game.is_solved():
+            status = "Waiting..."
+        elif self.message is not None:
+            status = self.message
+        elif self.game.is_solved() and not self.solve_running:
+            status = "You solved the puzzle!"
+        else:
+            status = None
+        if status == self.status:
+            return
+        self.status = status
+        self.window.fill(self.BACKGROUND_COLOR, self.status_rect)
+        if status is not None:
+            message = self.render_status(status, cache)
+            self.window.blit(message, message.get_rect(center=(self.BOARD_SIZE // 1.5,
+                                                               self.BOARD_SIZE + self.STATUS_CENTER_OFFSET)))
+        self.dirty.append(self.status_rect)
+
+    def flip(self):
+        # Оновлює на екрані лише змінені прямокутники; кадр без змін пропускається
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
 
     def moving(self, event):
         if event.key == K_UP and not self.solve_running:
@@ -164,10 +291,23 @@ class GameWindow:
         solve_button = Button("Solve", solve_button_rect, pygame.font.Font(None, 24), (255, 255, 255), (0, 102, 51), self.solve_game)
         buttons.append(solve_button)
 
+        self.quit_button = quit_button
+        self.solve_button = solve_button  # Під час пошуку ця кнопка скасовує його
+
         return buttons
 
     def run(self):
         clock = pygame.time.Clock()
+        try:
+            self.loop(clock)
+        finally:
+            # Процес розв'язувача не демонічний і має бути зупинений навіть при помилці
+            if self.solver_process is not None:
+                self.solver_process.terminate()
+        save_board_to_file(self.board, "board.txt")
+        pygame.quit()  # Завершення роботи pygame
+
+    def loop(self, clock):
         while self.running:
             for event in pygame.event.get():
                 if event.type == QUIT:  # Перевірка на вихід з програми
@@ -177,23 +317,13 @@ class GameWindow:
                     self.empty_row = self.game.empty_row
                     self.empty_col = self.game.empty_col
                     self.board = self.game.puzzle
-                    self.tiles = self.create_tiles(self.board)
-                if not self.solve_running:  # Перевірка, чи алгоритм розв'язку не працює
-                    for button in self.buttons:
+                for button in self.buttons:
+                    # Під час розв'язку працюють лише кнопки скасування та виходу
+                    if not self.solve_running or button in (self.solve_button, self.quit_button):
                         button.handle_event(event)  # Обробка подій
-            self.draw_board()  # Оновлення відображення
-            for button in self.buttons:
-                button.draw(self.window)
-            if self.solve_running:
-                if not self.game.is_solved():
-                    message = pygame.font.Font(None, 48).render("Waiting...", True, (0, 0, 0))
-                    message_rect = message.get_rect(center=(self.BOARD_SIZE // 1.5, self.BOARD_SIZE + 170))
-                    self.window.blit(message, message_rect)
-            if self.game.is_solved() and not self.solve_running:
-                message = pygame.font.Font(None, 48).render("You solved the puzzle!", True, (0, 0, 0))
-                message_rect = message.get_rect(center=(self.BOARD_SIZE // 1.5, self.BOARD_SIZE + 170))
-                self.window.blit(message, message_rect)
-            pygame.display.update()
-            clock.tick(self.FPS)  # Затримка, щоб обмежити FPS
-        save_board_to_file(self.board, "board.txt")
-        pygame.quit()  # Завершення роботи pygame
\ No newline at end of file
+            self.handle_solver()
+            self.animate_step()
+            self.draw_board()  # Оновлення відображення змінених плиток
+            self.draw_status()
+            self.flip()
+            clock.tick(self.FPS)  # Затримка, щоб обмежити FPS
\ No newline at end of file
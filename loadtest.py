@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from generator import generate
+
+
+async def post(reader, writer, host, body):
+    #Надсилає POST /solve через відкрите з'єднання і повертає (код, відповідь)
+    writer.write(("POST /solve HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                  "Content-Length: %d\r\n\r\n" % (host, len(body))).encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, boards, options, latencies, statuses):
+    #Одне з'єднання keep-alive, що по черзі надсилає дошки зі спільної черги
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while boards:
+            body = json.dumps(dict(options, board=boards.pop())).encode("utf-8")
+            tic = time.perf_counter()
+            status, response = await post(reader, writer, host, body)
+            latencies.append(time.perf_counter() - tic)
+            key = response.get("status", str(status)) if status == 200 else str(status)
+            statuses[key] = statuses.get(key, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+async def run(host, port, boards, concurrency, options):
+    #Надсилає всі 'boards' через 'concurrency' одночасних з'єднань і повертає звіт
+    latencies, statuses = [], {}
+    queue = list(reversed(boards))
+    tic = time.perf_counter()
+    await asyncio.gather(*[client(host, port, queue, options, latencies, statuses)
+                           for _ in range(concurrency)])
+    elapsed = time.perf_counter() - tic
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies, default=0.0),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Навантажувальний тест сервера розв'язувача (server.py)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8015)
+    parser.add_argument("--count", type=int, default=200, help="кількість запитів")
+    parser.add_argument("--depth", type=int, default=30, help="довжина перемішування дошок")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8, help="кількість одночасних з'єднань")
+    parser.add_argument("--algorithm", default=None, help="алгоритм (за замовчуванням - серверний)")
+    parser.add_argument("--timeout", type=float, default=None, help="крайній строк запиту, с")
+    parser.add_argument("--json", action="store_true", help="вивести звіт у форматі JSON")
+    args = parser.parse_args()
+
+    boards = list(generate(args.count, args.depth, args.size, args.seed))
+    options = {}
+    if args.algorithm is not None:
+        options["algorithm"] = args.algorithm
+    if args.timeout is not None:
+        options["timeout"] = args.timeout
+    report = asyncio.run(run(args.host, args.port, boards, args.concurrency, options))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("%d запитів за %.2f с, %.1f запитів/с; затримка p50 %.1f мс, p99 %.1f мс, max %.1f мс"
+              % (report["requests"], report["elapsed"], report["throughput"], report["p50"] * 1000,
+                 report["p99"] * 1000, report["max"] * 1000))
+        print("Статуси: %s" % ", ".join("%s %d" % item for item in sorted(report["statuses"].items())))
+    failed = sum(count for status, count in report["statuses"].items() if status != "solved")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,25 @@
-import pygame
-import interface as i
+import argparse
+import multiprocessing
+from game import MAX_SIZE, MIN_SIZE, read_board_size
 
-pygame.init()
+if __name__ == "__main__":
+    # Розв'язувач працює в окремому процесі, який імпортує цей модуль повторно,
+    # тож вікно створюється лише в головному процесі
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Гра у п'ятнашки")
+    parser.add_argument("--size", type=int, default=None,
+                        help="кількість пазлів у рядку, від %d до %d (за замовчуванням - як у board.txt або 4)"
+                             % (MIN_SIZE, MAX_SIZE))
+    args = parser.parse_args()
+    size = args.size or read_board_size("board.txt") or 4
+    if not MIN_SIZE <= size <= MAX_SIZE:
+        parser.error("розмір дошки має бути від %d до %d" % (MIN_SIZE, MAX_SIZE))
 
-window = i.GameWindow()
-window.run()
+    # pygame завантажується лише перед відкриттям вікна: '--help', помилки
+    # аргументів і процес розв'язувача обходяться без нього
+    import pygame
+    import interface as i
+    pygame.init()
+
+    window = i.GameWindow(size)
+    window.run()
@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from pattern_db import PatternDatabase
+from solver import Node, Solver, TimedHeuristic, bounded_dfs, move_table, tile_bits
+
+# Паралельний IDA* для однієї дошки. Дерево ходів від початкової дошки
+# розкривається в ширину до шару з щонайменше UNITS_PER_WORKER станами на
+# процес; кожен стан шару - одиниця роботи. Ітерація IDA* з межею f
+# розподіляє всі одиниці між процесами пулу, і кожен процес проходить
+# піддерево своєї одиниці з цією межею. Межа наступної ітерації - найменша
+# f понад поточну межу по всіх одиницях, тож розв'язок, знайдений будь-яким
+# процесом, оптимальний, як і в послідовному IDA*. Знайдена межа записується
+# у спільну змінну, і решта процесів припиняє пошук у цій ітерації
+
+# Кількість одиниць роботи на процес: більше - рівномірніше навантаження,
+# але глибший початковий шар і більше дрібних завдань
+UNITS_PER_WORKER = 16
+
+# Як часто (у розкритих вузлах) процес перевіряє спільну межу
+CHECK_EVERY = 4096
+
+# Як часто (с) головний процес перевіряє обмеження пошуку (див. Solver.checkpoint)
+WAIT_INTERVAL = 0.05
+
+# Значення спільної межі, поки розв'язок не знайдено; -1 зупиняє всі процеси
+NOT_FOUND = 2 ** 31 - 1
+
+
+def share_heuristic(heuristic):
+    #Повертає (опис евристики для процесів пулу, сегмент спільної пам'яті
+    #або None). Таблиці бази шаблонів один раз копіюються у спільну пам'ять,
+    #і процеси читають їх звідти без власних копій; інші евристики мають
+    #невеликі таблиці і передаються процесам як є
+    if not isinstance(heuristic, PatternDatabase):
+        return ("object", heuristic), None
+    size = sum(len(table) for table in heuristic.tables)
+    segment = shared_memory.SharedMemory(create=True, size=max(1, size))
+    offset = 0
+    for table in heuristic.tables:
+        segment.buf[offset:offset + len(table)] = table
+        offset += len(table)
+    return ("pdb", segment.name, heuristic.width, heuristic.patterns), segment
+
+
+_heuristic = None
+_segment = None
+_stop = None
+
+
+def attach(shared, stop):
+    #Ініціалізує процес пулу: відкриває евристику (див. share_heuristic)
+    #і запам'ятовує спільну межу 'stop'
+    global _heuristic, _segment, _stop
+    if shared[0] == "pdb":
+        _, name, width, patterns = shared
+        _segment = shared_memory.SharedMemory(name=name)
+        bits = tile_bits(width)
+        tables, offset = [], 0
+        for pattern in patterns:
+            size = 1 << (bits * len(pattern))
+            tables.append(_segment.buf[offset:offset + size])
+            offset += size
+        _heuristic = PatternDatabase(width, patterns, tables)
+    else:
+        _heuristic = shared[1]
+    _stop = stop
+
+
+class _Stopped(Exception):
+    pass
+
+
+def search_unit(tiles, blank, g, previous, bound):
+    #Один прохід IDA* (див. solver.bounded_dfs) з межею 'bound' від стану
+    #одиниці роботи на глибині 'g', досягнутого дією 'previous'. Виконується
+    #у процесі пулу. Повертає (дії до розв'язку або None, найменша f понад
+    #межу або None, кількість розкритих і згенерованих вузлів)
+    heuristic = _heuristic
+    stop = _stop
+    check = CHECK_EVERY - 1
+    path = []
+    counters = [0, 0]  # Розкриті та згенеровані вузли
+
+    def expand(g, children):
+        counters[0] += 1
+        counters[1] += children
+        if counters[0] & check == 0 and stop.value <= bound:
+            raise _Stopped()
+
+    if stop.value <= bound:
+        return None, None, 0, 0
+    width = int(len(tiles) ** 0.5)
+    try:
+        t = bounded_dfs(tiles, width, heuristic, bound, blank, g, heuristic.reset(tiles), previous, path, expand)
+    except _Stopped:
+        return None, None, counters[0], counters[1]
+    if t is True:
+        return [action for _, action in path], None, counters[0], counters[1]
+    return None, t, counters[0], counters[1]
+
+
+def frontier(tiles, width, count):
+    #Розкриває дерево ходів від 'tiles' (без ходів, що скасовують попередній)
+    #пошарово в ширину, доки шар не матиме щонайменше 'count' різних станів.
+    #Повертає (дії до розв'язку, None), якщо розв'язок знайдено раніше - він
+    #найкоротший, - або (None, шар) зі списком (tiles, blank, дії)
+    neighbours = move_table(width)
+    goal = list(range(1, width * width)) + [0]
+    opposite = Solver.OPPOSITE
+    layer = [(list(tiles), tiles.index(0), [])]
+    while len(layer) < count:
+        following, seen = [], set()
+        for tiles, blank, actions in layer:
+            for to, action in neighbours[blank]:
+                if actions and opposite[action] == actions[-1]:
+                    continue
+                child = list(tiles)
+                child[blank], child[to] = child[to], 0
+                key = tuple(child)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if child == goal:
+                    return actions + [action], None
+                following.append((child, to, actions + [action]))
+        layer = following
+    return None, layer
+
+
+def parallel_idastar(solver, workers=None):
+    #Виконати паралельний IDA* для 'solver.start' у 'workers' процесах (за
+    #замовчуванням - кількість ядер) і повернути шлях до розв'язку, якщо він
+    #існує. Лічильники і обмеження - як у Solver: 'expanded' оновлюється
+    #після кожної завершеної одиниці, 'checkpoint' викликається кожні
+    #WAIT_INTERVAL секунд
+    workers = workers or os.cpu_count() or 1
+    start = solver.start
+    heuristic = solver.heuristic
+    if isinstance(heuristic, TimedHeuristic):
+        heuristic = heuristic.heuristic  # Час евристики в процесах пулу не вимірюється
+    stats = solver.stats
+
+    actions, units = frontier(list(start), start.width, workers * UNITS_PER_WORKER)
+    if actions is not None:
+        return Node.from_puzzle(start, heuristic).follow(actions).path
+
+    # "spawn" не копіює стан батьківського процесу, як і в background.SolveProcess
+    context = multiprocessing.get_context("spawn")
+    stop = context.RawValue('i', NOT_FOUND)
+    shared, segment = share_heuristic(heuristic)
+    executor = ProcessPoolExecutor(workers, mp_context=context, initializer=attach, initargs=(shared, stop))
+    try:
+        bound = heuristic.reset(list(start))
+        while True:
+            solver.bound = bound
+            futures = {executor.submit(search_unit, tiles, blank, len(path), path[-1], bound): path
+                       for tiles, blank, path in units}
+            pending, following, actions = set(futures), None, None
+            while pending:
+                done, pending = wait(pending, WAIT_INTERVAL, FIRST_COMPLETED)
+                for future in done:
+                    found, t, expanded, generated = future.result()
+                    solver.expanded += expanded
+                    stats.generated += generated
+                    if found is not None and actions is None:
+                        actions = futures[future] + found
+                        stop.value = bound
+                    elif t is not None and (following is None or t < following):
+                        following = t
+                if actions is None:
+                    solver.checkpoint()
+            if actions is not None:
+                return Node.from_puzzle(start, heuristic).follow(actions).path
+            if following is None:
+                return None  # Немає жодного ходу, розв'язку не існує
+            bound = following
+    finally:
+        stop.value = -1
+        executor.shutdown(wait=True, cancel_futures=True)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
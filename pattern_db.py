@@ -0,0 +1,213 @@
+import argparse
+import mmap
+import os
+import time
+from collections import deque
+
+from solver import move_table, tile_bits, unpack
+
+MAGIC = b"PDB1"
+
+# Стандартне розбиття тайлів "15-пазлу" на три непересічні шаблони 5-5-5.
+# Таблиці 6-6-3 чи 7-8 займають у сотні разів більше станів і не будуються
+# на чистому Python за прийнятний час, тому вони доступні лише через '--pattern'
+DEFAULT_PATTERNS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)],
+}
+
+# Таблиці за замовчуванням лежать поруч з модулем, незалежно від робочого каталогу
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle%d.pdb")
+
+
+def build_table(width, pattern):
+    #Будує таблицю шаблону 'pattern' пошуком 0-1 BFS від розв'язаного стану.
+    #Стан абстрактної задачі - позиції тайлів шаблону та позиція '0'; хід
+    #коштує 1, лише якщо переміщується тайл шаблону, тож таблиці різних
+    #непересічних шаблонів можна додавати. Індекс таблиці - позиції тайлів
+    #шаблону, записані по 'tile_bits' біт на тайл; значення - мінімальна
+    #кількість ходів тайлами шаблону по всіх позиціях '0'
+
+    bits = tile_bits(width)
+    mask = (1 << bits) - 1
+    k = len(pattern)
+    shift = bits * k
+    adjacent = [[to for to, _ in moves] for moves in move_table(width)]
+
+    table = bytearray(b"\xff") * (1 << shift)
+    closed = bytearray(1 << (shift + bits))
+
+    goal = 0
+    for j, tile in enumerate(pattern):
+        goal |= (tile - 1) << (bits * j)
+
+    queue = deque([(goal, width * width - 1, 0)])
+    while queue:
+        cfg, blank, d = queue.popleft()
+        key = cfg | (blank << shift)
+        if closed[key]:
+            continue
+        closed[key] = 1
+        if table[cfg] == 255:
+            table[cfg] = d
+
+        positions = [(cfg >> (bits * j)) & mask for j in range(k)]
+        for n in adjacent[blank]:
+            if n in positions:
+                j = positions.index(n)
+                child = cfg + ((blank - n) << (bits * j))
+                if not closed[child | (n << shift)]:
+                    queue.append((child, n, d + 1))
+            elif not closed[cfg | (n << shift)]:
+                queue.appendleft((cfg, n, d))
+    return table
+
+
+class PatternDatabase:
+    #Адитивна евристика на базі непересічних шаблонів.
+    #- 'width' - ширина дошки
+    #- 'patterns' - список кортежів номерів тайлів, по одному на таблицю
+    #- 'tables' - таблиці відстаней (bytes-подібні об'єкти), по одній на шаблон
+
+    def __init__(self, width, patterns, tables):
+        self.width = width
+        self.patterns = [tuple(pattern) for pattern in patterns]
+        self.tables = tables
+        self.bits = tile_bits(width)
+        # Для кожного тайлу: (номер шаблону, зсув у ключі таблиці) або None
+        self.owner = [None] * (width * width)
+        for p, pattern in enumerate(self.patterns):
+            for j, tile in enumerate(pattern):
+                self.owner[tile] = (p, self.bits * j)
+        self.cfgs = None
+
+    @staticmethod
+    def build(width, patterns=None):
+        patterns = patterns or DEFAULT_PATTERNS[width]
+        return PatternDatabase(width, patterns, [build_table(width, pattern) for pattern in patterns])
+
+    @staticmethod
+    def load(path):
+        #Відображає файл у пам'ять; таблиці не копіюються, а читаються
+        #безпосередньо з відображення
+        with open(path, "rb") as file:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:4] != MAGIC:
+            raise ValueError("Файл %s не є базою шаблонів" % path)
+
+        width, count = mm[4], mm[5]
+        bits = tile_bits(width)
+        offset = 6
+        patterns = []
+        for _ in range(count):
+            k = mm[offset]
+            patterns.append(tuple(mm[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+
+        view = memoryview(mm)
+        tables = []
+        for pattern in patterns:
+            size = 1 << (bits * len(pattern))
+            tables.append(view[offset:offset + size])
+            offset += size
+        return PatternDatabase(width, patterns, tables)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(MAGIC + bytes([self.width, len(self.patterns)]))
+            for pattern in self.patterns:
+                file.write(bytes([len(pattern)]) + bytes(pattern))
+            for table in self.tables:
+                file.write(table)
+
+    def keys(self, tiles):
+        #Повертає ключі таблиць для плоского списку тайлів
+        cfgs = [0] * len(self.patterns)
+        for pos, tile in enumerate(tiles):
+            owner = self.owner[tile]
+            if owner is not None:
+                cfgs[owner[0]] |= pos << owner[1]
+        return cfgs
+
+    def __call__(self, state):
+        #Значення евристики для запакованого стану
+        cfgs = self.keys(unpack(state, self.width))
+        return sum(table[cfg] for table, cfg in zip(self.tables, cfgs))
+
+    def update(self, state, h, tile, at, to):
+        #Значення евристики після ходу для запакованого стану 'state' зі
+        #значенням 'h'; змінюється лише таблиця шаблону, якому належить тайл
+        owner = self.owner[tile]
+        if owner is None:
+            return h
+        p, shift = owner
+        bits, mask = self.bits, (1 << self.bits) - 1
+        cfg = 0
+        for pos in range(self.width * self.width):
+            other = self.owner[(state >> (pos * bits)) & mask]
+            if other is not None and other[0] == p:
+                cfg |= pos << other[1]
+        table = self.tables[p]
+        return h - table[cfg] + table[cfg + ((to - at) << shift)]
+
+    def reset(self, tiles):
+        #Запам'ятовує ключі таблиць для дошки 'tiles' та повертає значення
+        #евристики; далі ключі оновлюються ходами через 'delta'
+        self.cfgs = self.keys(tiles)
+        return sum(table[cfg] for table, cfg in zip(self.tables, self.cfgs))
+
+    def delta(self, tile, at, to):
+        #Зміна евристики при переміщенні тайлу 'tile' з позиції 'at' на 'to'
+        owner = self.owner[tile]
+        if owner is None:
+            return 0
+        p, shift = owner
+        table, cfg = self.tables[p], self.cfgs[p]
+        child = cfg + ((to - at) << shift)
+        self.cfgs[p] = child
+        return table[child] - table[cfg]
+
+
+_loaded = {}
+
+
+def load_default(width):
+    #Завантажує (один раз) таблиці за замовчуванням для дошки ширини 'width'.
+    #Файли таблиць не зберігаються в репозиторії і генеруються окремо
+    if width not in _loaded:
+        path = DEFAULT_PATH % width
+        try:
+            _loaded[width] = PatternDatabase.load(path)
+        except FileNotFoundError:
+            raise FileNotFoundError("Файл таблиць %s не знайдено; згенеруйте його командою "
+                                    "'python pattern_db.py --width %d'" % (path, width)) from None
+    return _loaded[width]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерація таблиць бази шаблонів")
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--pattern", action="append",
+                        help="номери тайлів шаблону через кому, можна повторювати")
+    parser.add_argument("--output", help="файл таблиць (за замовчуванням puzzle<width>.pdb)")
+    args = parser.parse_args()
+
+    if args.pattern:
+        patterns = [tuple(map(int, pattern.split(","))) for pattern in args.pattern]
+    else:
+        patterns = DEFAULT_PATTERNS[args.width]
+
+    tables = []
+    for pattern in patterns:
+        tic = time.perf_counter()
+        tables.append(build_table(args.width, pattern))
+        toc = time.perf_counter()
+        print("Шаблон %s: %d байт, %.1f с" % (pattern, len(tables[-1]), toc - tic))
+
+    output = args.output or DEFAULT_PATH % args.width
+    PatternDatabase(args.width, patterns, tables).save(output)
+    print("Таблиці збережено у файлі", output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import cProfile
+import json
+import platform
+import pstats
+import sys
+
+from solver import HEURISTICS, Puzzle, SearchLimit, Solver
+
+# Як часто (у розкритих вузлах) знімається зріз лічильників розв'язувача
+SAMPLE_EVERY = 16384
+
+
+def top_functions(profiler, limit=15):
+    #Повертає 'limit' функцій з найбільшим власним часом у вигляді словників
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, own, total, _) in stats.stats.items():
+        rows.append({"function": "%s:%d(%s)" % (filename, line, name),
+                     "calls": calls, "own_time": own, "total_time": total})
+    rows.sort(key=lambda row: row["own_time"], reverse=True)
+    return rows[:limit]
+
+
+def profile_solve(puzzle, algorithm="astar", heuristic="manhattan", timeout=None,
+                  sample_every=SAMPLE_EVERY, pstats_path=None, use_cprofile=True):
+    #Розв'язує 'puzzle' з вимірюванням часу евристики і повертає звіт-словник:
+    #- 'status' - "solved", "unsolved" або назва класу SearchLimit
+    #- 'stats' - підсумкові лічильники (див. SearchStats)
+    #- 'samples' - зрізи лічильників кожні 'sample_every' розкритих вузлів
+    #- 'top' - найдорожчі функції за даними cProfile, якщо 'use_cprofile';
+    #  повні дані cProfile записуються у 'pstats_path', якщо задано.
+    #cProfile суттєво сповільнює пошук, тож абсолютні часи з ним більші
+    samples = []
+
+    def sample(solver):
+        stats = solver.stats
+        samples.append({"expanded": solver.expanded, "generated": stats.generated,
+                        "duplicates": stats.duplicates, "peak_open": stats.peak_open,
+                        "bound": solver.bound, "heuristic_time": stats.heuristic_time,
+                        "elapsed": solver.elapsed})
+
+    solver = Solver(puzzle, algorithm, heuristic, timeout, progress=sample, check_every=sample_every,
+                    timing=True)
+    profiler = cProfile.Profile() if use_cprofile else None
+    status, length = "solved", None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        path = solver.solve()
+    except SearchLimit as error:
+        status = type(error).__name__
+    else:
+        if path is None:
+            status = "unsolved" if not puzzle.solved else "solved"
+            length = 0 if puzzle.solved else None
+        else:
+            length = len(list(path)) - 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    report = {
+        "board": " ".join(map(str, puzzle)),
+        "size": puzzle.width,
+        "algorithm": algorithm,
+        "heuristic": heuristic,
+        "status": status,
+        "length": length,
+        "stats": solver.stats.as_dict(),
+        "samples": samples,
+        "cprofile": use_cprofile,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if profiler is not None:
+        report["top"] = top_functions(profiler)
+        if pstats_path is not None:
+            profiler.dump_stats(pstats_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Звіт про роботу розв'язувача на одній дошці")
+    parser.add_argument("board", nargs="?", help="дошка (числа через пробіл); за замовчуванням board.txt")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--algorithm", choices=Solver.ALGORITHMS, default="astar")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    parser.add_argument("--timeout", type=float, default=None, help="обмеження часу, с")
+    parser.add_argument("--sample-every", type=int, default=SAMPLE_EVERY,
+                        help="інтервал зрізів лічильників у розкритих вузлах")
+    parser.add_argument("--no-cprofile", action="store_true", help="не запускати cProfile")
+    parser.add_argument("--json", help="файл звіту JSON (за замовчуванням stdout)")
+    parser.add_argument("--pstats", help="файл даних cProfile (для pstats або snakeviz)")
+    args = parser.parse_args()
+
+    if args.board is None:
+        with open("board.txt") as f:
+            args.board = f.read()
+    puzzle = Puzzle.from_string(args.board, args.size)
+    if puzzle is None:
+        parser.error("дошка має містити %d чисел" % (args.size * args.size))
+
+    report = profile_solve(puzzle, args.algorithm, args.heuristic, args.timeout, args.sample_every,
+                           args.pstats, not args.no_cprofile)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    stats = report["stats"]
+    print("%s: %s, expanded %d, generated %d, duplicates %d, peak open %d, heuristic %.3f s of %.3f s"
+          % (report["status"], report["length"], stats["expanded"], stats["generated"],
+             stats["duplicates"], stats["peak_open"], stats["heuristic_time"], stats["elapsed"]),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
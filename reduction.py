@@ -0,0 +1,167 @@
+from collections import deque
+
+from game import Game
+from solver import Puzzle, Solver, move_table
+
+# Ширина залишку дошки, який розв'язується оптимальним пошуком А*
+LAST_WIDTH = 3
+
+
+class Reduction:
+    #Швидкий неоптимальний розв'язувач дошок довільної ширини (від 3).
+    #Дошка зменшується по одному рядку і стовпцю: верхній рядок і лівий
+    #стовпець залишку збираються тайл за тайлом і фіксуються, доки не
+    #залишиться 3x3 у правому нижньому куті; його розв'язує Solver (А*)
+    #- 'tiles' - плоский список тайлів, 'width' - ширина дошки
+    #Результат 'solve' - список дій тайлу '0' (див. Game.move)
+
+    def __init__(self, tiles, width):
+        self.width = width
+        self.tiles = list(tiles)
+        self.blank = self.tiles.index(0)
+        self.locked = [False] * (width * width)  # Зафіксовані (зібрані) позиції
+        self.neighbours = move_table(width)
+        self.actions = []
+
+    def move_blank(self, to):
+        #Переміщує тайл '0' на сусідню позицію 'to'
+        for position, action in self.neighbours[self.blank]:
+            if position == to:
+                self.tiles[self.blank], self.tiles[to] = self.tiles[to], 0
+                self.blank = to
+                if self.actions and self.actions[-1] == Solver.OPPOSITE[action]:
+                    self.actions.pop()  # Хід скасовує попередній
+                else:
+                    self.actions.append(action)
+                return
+        raise ValueError("Позиція %d не є сусідньою до тайлу '0'" % to)
+
+    def path(self, start, target, avoid=(), targets=()):
+        #Найкоротший шлях (список позицій без 'start') від 'start' до 'target'
+        #або до найближчої з позицій 'targets' по незафіксованих позиціях,
+        #оминаючи позиції 'avoid'
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            position = queue.popleft()
+            if position == target or position in targets:
+                target = position
+                break
+            for following, _ in self.neighbours[position]:
+                if following not in previous and not self.locked[following] and following not in avoid:
+                    previous[following] = position
+                    queue.append(following)
+        if target not in previous:
+            raise ValueError("Позиція %s недосяжна" % target)
+        result = []
+        while target != start:
+            result.append(target)
+            target = previous[target]
+        return result[::-1]
+
+    def walk_blank(self, target, avoid=()):
+        for position in self.path(self.blank, target, avoid):
+            self.move_blank(position)
+
+    def place(self, tile, target):
+        #Переміщує 'tile' на позицію 'target' і фіксує його там: тайл '0'
+        #обходить тайл і стає на наступну клітинку його шляху, після чого
+        #тайл зсувається на неї
+        position = self.tiles.index(tile)
+        for step in self.path(position, target):
+            self.walk_blank(step, avoid=(position,))
+            self.move_blank(position)
+            position = step
+        self.locked[target] = True
+
+    def arrange(self, window, a, b, target_a, target_b):
+        #Пошук у ширину по розташуваннях (тайл 'a', тайл 'b', тайл '0')
+        #всередині 'window' - набору позицій, де вже стоять усі три; інші
+        #тайли вікна переставляються довільно
+        start = (self.tiles.index(a), self.tiles.index(b), self.blank)
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            at_a, at_b, blank = state
+            if at_a == target_a and at_b == target_b:
+                break
+            for to, _ in self.neighbours[blank]:
+                if to not in window:
+                    continue
+                following = (blank if to == at_a else at_a, blank if to == at_b else at_b, to)
+                if following not in previous:
+                    previous[following] = state
+                    queue.append(following)
+        else:
+            raise ValueError("Тайли %d і %d не можна поставити на місця" % (a, b))
+        moves = []
+        while previous[state] is not None:
+            moves.append(state[2])
+            state = previous[state]
+        for to in reversed(moves):
+            self.move_blank(to)
+
+    def solve_line(self, k, along_row):
+        #Збирає рядок 'k' (along_row) або стовпець 'k' залишку дошки.
+        #Останні два тайли лінії спершу зводяться у вікно 3x2 (3 лінії
+        #завглибшки, 2 позиції вздовж лінії) разом з тайлом '0', а тоді
+        #ставляться на місця пошуком у ширину всередині вікна - так
+        #обходяться тупикові розташування біля кута лінії
+        width = self.width
+        if along_row:
+            at = lambda depth, j: (k + depth) * width + j
+            first = k
+        else:
+            at = lambda depth, j: j * width + k + depth
+            first = k + 1  # Кутова позиція вже зібрана разом з рядком
+
+        for j in range(first, width - 2):
+            self.place(at(0, j) + 1, at(0, j))
+
+        target_a, target_b = at(0, width - 2), at(0, width - 1)
+        a, b = target_a + 1, target_b + 1
+        if self.tiles[target_a] != a or self.tiles[target_b] != b:
+            window = {at(depth, j) for depth in range(3) for j in (width - 2, width - 1)}
+            self.place(a, target_b)
+            if self.tiles.index(b) not in window:
+                self.place(b, at(1, width - 1))
+            for position in window:
+                self.locked[position] = False
+            if self.blank not in window:
+                occupied = (self.tiles.index(a), self.tiles.index(b))
+                path = self.path(self.blank, None, occupied, window)
+                for position in path:
+                    self.move_blank(position)
+            self.arrange(window, a, b, target_a, target_b)
+        self.locked[target_a] = self.locked[target_b] = True
+
+    def solve(self):
+        #Повертає список дій, що розв'язують дошку, або None, якщо розв'язку немає
+        width = self.width
+        for k in range(width - LAST_WIDTH):
+            self.solve_line(k, True)
+            self.solve_line(k, False)
+
+        # Залишок LAST_WIDTH x LAST_WIDTH з тайлами, перенумерованими за
+        # їхніми цільовими позиціями всередині залишку
+        offset = width - LAST_WIDTH
+        positions = [(offset + row) * width + offset + col
+                     for row in range(LAST_WIDTH) for col in range(LAST_WIDTH)]
+        labels = {position + 1: index + 1 for index, position in enumerate(positions)}
+        labels[0] = 0
+        sub = [labels[self.tiles[position]] for position in positions]
+        puzzle = Puzzle([sub[i:i + LAST_WIDTH] for i in range(0, len(sub), LAST_WIDTH)])
+        if not puzzle.solved:
+            if not Game.is_solvable(puzzle):
+                return None
+            for node in list(Solver(puzzle, "astar", "manhattan").solve())[1:]:
+                self.move_blank(positions[node.blank])
+        return self.actions
+
+
+def solve(tiles, width):
+    #Повертає список дій, що розв'язують дошку 'tiles' (плоский список), або None
+    if width < LAST_WIDTH:
+        raise ValueError("Ширина дошки має бути не меншою за %d" % LAST_WIDTH)
+    return Reduction(tiles, width).solve()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import sys
+import time
+
+from cache import ACTIONS, CODES
+from solver import move_table
+
+# Компактні формати розв'язку:
+# - рядок ходів тайлу '0' по одній літері на хід (див. cache.CODES), "ULDR..."
+# - упаковані байти: 4 байти кількості ходів (little-endian), далі по 2 біти
+#   на хід у порядку LETTERS, перший хід - у молодших бітах першого байта
+LETTERS = "ULRD"
+_BITS = {letter: code for code, letter in enumerate(LETTERS)}
+_BYTES = ["".join(LETTERS[(byte >> shift) & 3] for shift in (0, 2, 4, 6)) for byte in range(256)]
+
+
+class InvalidMove(ValueError):
+    #Хід з номером 'index' виводить тайл '0' за межі дошки або невідомий
+    def __init__(self, index, code):
+        super().__init__("Неможливий хід %r на позиції %d" % (code, index))
+        self.index = index
+        self.code = code
+
+
+def encode(actions):
+    #Список дій тайлу '0' ('up', 'down', ...) -> рядок ходів
+    return "".join([CODES[action] for action in actions])
+
+
+def decode(moves):
+    #Рядок ходів -> список дій тайлу '0' (див. Game.move)
+    return [ACTIONS[code] for code in moves]
+
+
+def pack_moves(moves):
+    #Рядок ходів -> упаковані байти (2 біти на хід)
+    data = bytearray(len(moves).to_bytes(4, "little"))
+    for start in range(0, len(moves), 4):
+        byte = 0
+        for shift, code in enumerate(moves[start:start + 4]):
+            byte |= _BITS[code] << (shift * 2)
+        data.append(byte)
+    return bytes(data)
+
+
+def unpack_moves(data):
+    #Упаковані байти -> рядок ходів
+    count = int.from_bytes(data[:4], "little")
+    return "".join([_BYTES[byte] for byte in data[4:]])[:count]
+
+
+_tables = {}
+
+
+def replay_table(width):
+    #Для кожної позиції тайлу '0' - словник {літера ходу: нова позиція '0'}
+    #лише з можливими ходами. Будується один раз для кожної ширини
+    if width not in _tables:
+        _tables[width] = [{CODES[action]: to for to, action in moves} for moves in move_table(width)]
+    return _tables[width]
+
+
+def apply(tiles, width, moves):
+    #Виконує ходи 'moves' на місці над плоским списком 'tiles' і повертає
+    #нову позицію тайлу '0'. Проміжні дошки не створюються: тайл '0'
+    #записується лише після останнього ходу. При неможливому ході піднімає
+    #InvalidMove, а 'tiles' залишається у стані перед цим ходом
+    table = replay_table(width)
+    blank = tiles.index(0)
+    index = 0
+    try:
+        for index, code in enumerate(moves):
+            to = table[blank][code]
+            tiles[blank] = tiles[to]
+            blank = to
+    except KeyError:
+        tiles[blank] = 0
+        raise InvalidMove(index, code) from None
+    tiles[blank] = 0
+    return blank
+
+
+def verify(tiles, width, moves):
+    #Чи розв'язують ходи 'moves' дошку 'tiles' (список не змінюється)
+    tiles = list(tiles)
+    try:
+        apply(tiles, width, moves)
+    except InvalidMove:
+        return False
+    return tiles == list(range(1, width * width)) + [0]
+
+
+def states(tiles, width, moves):
+    #Генерує пари (літера ходу, tiles) після кожного ходу. 'tiles' - той самий
+    #список, що змінюється на місці; копіюйте його, якщо стан потрібен пізніше
+    table = replay_table(width)
+    blank = tiles.index(0)
+    for index, code in enumerate(moves):
+        to = table[blank].get(code)
+        if to is None:
+            raise InvalidMove(index, code)
+        tiles[blank], tiles[to] = tiles[to], 0
+        blank = to
+        yield code, tiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перевірка розв'язків з результатів batch.py")
+    parser.add_argument("input", help="файл JSON Lines з результатами або '-' для стандартного вводу")
+    parser.add_argument("--size", type=int, default=4)
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    checked, failed, moves_total, elapsed = 0, 0, 0, 0.0
+    with source:
+        for line in source:
+            result = json.loads(line)
+            if result.get("status") != "solved" or result.get("moves") is None:
+                continue
+            moves = result["moves"]
+            if not isinstance(moves, str):
+                moves = encode(moves)
+            tiles = list(map(int, result["board"].split()))
+            tic = time.perf_counter()
+            ok = verify(tiles, args.size, moves)
+            elapsed += time.perf_counter() - tic
+            checked += 1
+            moves_total += len(moves)
+            if not ok:
+                failed += 1
+                print("Розв'язок не підходить: %s" % result["board"])
+
+    rate = moves_total / elapsed if elapsed > 0 else 0
+    print("Перевірено %d розв'язків (%d ходів), хибних %d, %.0f ходів/с" % (checked, moves_total, failed, rate),
+          file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
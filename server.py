@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import solve_board
+from replay import encode
+from solver import HEURISTICS, Solver
+
+# Найбільший розмір тіла запиту, байт
+MAX_BODY = 65536
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class RequestError(Exception):
+    #Запит не можна виконати; 'status' - код відповіді HTTP
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_board(body, content_type):
+    #Повертає (рядок дошки, ширина, параметри) з тіла запиту: JSON
+    #{"board": [[...], ...] або "1 2 3 ...", "algorithm": ..., ...} або текст
+    #у форматі board.txt (ширина визначається кількістю чисел)
+    if content_type.startswith("application/json"):
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise RequestError(400, "Некоректний JSON") from None
+        if not isinstance(request, dict) or "board" not in request:
+            raise RequestError(400, "Очікується об'єкт з полем 'board'")
+        board = request["board"]
+        if isinstance(board, list):
+            try:
+                board = " ".join(str(number) for row in board for number in row)
+            except TypeError:
+                raise RequestError(400, "Поле 'board' має бути списком рядків") from None
+    else:
+        request = {}
+        board = body.decode("utf-8", "replace")
+    numbers = str(board).split()
+    width = int(len(numbers) ** 0.5)
+    if width < 2 or width * width != len(numbers):
+        raise RequestError(400, "Дошка має бути квадратною")
+    return " ".join(numbers), width, request
+
+
+class SolveServer:
+    #HTTP/JSON сервер розв'язувача на asyncio з пулом процесів:
+    #- POST /solve - розв'язати дошку (див. parse_board); необов'язкові поля
+    #  JSON: "algorithm", "heuristic", "weight", "timeout" (с, крайній строк
+    #  з моменту надходження, включно з очікуванням у черзі)
+    #- GET /stats - лічильники сервера
+    #Одночасно розв'язується не більше 'workers' дошок, ще не більше
+    #'queue_size' чекають; решта отримує 503. Запит, крайній строк якого
+    #минув у черзі або під час пошуку, отримує 504. Процеси пулу спільно
+    #використовують кеш розв'язків sqlite 'cache_path', якщо задано
+
+    def __init__(self, workers=None, queue_size=64, timeout=30.0, cache_path=None,
+                 algorithm="astar", heuristic="manhattan"):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout  # Крайній строк за замовчуванням, с
+        self.cache_path = cache_path
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.waiting = 0
+        self.running = 0
+        self.counters = {"solved": 0, "failed": 0, "rejected": 0, "expired": 0, "invalid": 0}
+
+    async def solve(self, body, content_type):
+        arrived = time.perf_counter()
+        board, width, request = parse_board(body, content_type)
+        algorithm = request.get("algorithm", self.algorithm)
+        heuristic = request.get("heuristic", self.heuristic)
+        if algorithm not in Solver.ALGORITHMS or heuristic not in HEURISTICS:
+            raise RequestError(400, "Невідомий алгоритм або евристика")
+        try:
+            timeout = float(request.get("timeout", self.timeout))
+            weight = request.get("weight")
+            weight = float(weight) if weight is not None else None
+        except (TypeError, ValueError):
+            raise RequestError(400, "Некоректне значення 'timeout' або 'weight'") from None
+        deadline = arrived + timeout
+
+        if self.waiting >= self.queue_size:
+            self.counters["rejected"] += 1
+            raise RequestError(503, "Черга заповнена")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.counters["expired"] += 1
+            raise RequestError(504, "Крайній строк минув у черзі") from None
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            queued = time.perf_counter() - arrived
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.counters["expired"] += 1
+                raise RequestError(504, "Крайній строк минув у черзі")
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, solve_board, 0, board, width, algorithm, heuristic,
+                                          remaining, self.cache_path, weight)
+            try:
+                # Розв'язувач сам зупиняється за 'remaining'; запас - на запуск процесу
+                result = await asyncio.wait_for(future, remaining + 1.0)
+            except asyncio.TimeoutError:
+                self.counters["expired"] += 1
+                raise RequestError(504, "Крайній строк минув під час пошуку") from None
+        finally:
+            self.running -= 1
+            self.slots.release()
+
+        del result["index"]
+        if result["moves"] is not None:
+            result["moves"] = encode(result["moves"])
+        result["queued"] = queued
+        if result["status"] == "solved":
+            self.counters["solved"] += 1
+        elif result["status"] == "timeout":
+            self.counters["expired"] += 1
+        elif result["status"] == "invalid":
+            self.counters["invalid"] += 1
+        else:
+            self.counters["failed"] += 1
+        return result
+
+    def stats(self):
+        return dict(self.counters, waiting=self.waiting, running=self.running, workers=self.workers,
+                    queue_size=self.queue_size)
+
+    async def handle(self, reader, writer):
+        #Обслуговує одне з'єднання; підтримує кілька запитів (keep-alive)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Некоректний запит"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": "Завеликий запит"}, False)
+                    break
+                body = await reader.readexactly(length)
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    if path == "/solve" and method == "POST":
+                        status, response = 200, await self.solve(body, headers.get("content-type", ""))
+                    elif path == "/stats" and method == "GET":
+                        status, response = 200, self.stats()
+                    elif path in ("/solve", "/stats"):
+                        status, response = 405, {"error": "Метод не підтримується"}
+                    else:
+                        status, response = 404, {"error": "Невідомий шлях"}
+                except RequestError as error:
+                    status, response = error.status, {"error": str(error)}
+                except Exception as error:  # Наприклад, аварійне завершення процесу пулу
+                    self.counters["failed"] += 1
+                    status, response = 500, {"error": "%s: %s" % (type(error).__name__, error)}
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, response, keep_alive):
+        body = json.dumps(response, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        head = ("HTTP/1.1 %d %s\r\nContent-Type: application/json; charset=utf-8\r\n"
+                "Content-Length: %d\r\nConnection: %s\r\n\r\n"
+                % (status, REASONS[status], len(body), "keep-alive" if keep_alive else "close"))
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print("Сервер розв'язувача слухає http://%s:%d (%d процесів)" % (host, port, self.workers), flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON сервер розв'язувача")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8015)
+    parser.add_argument("--workers", type=int, default=None, help="кількість процесів розв'язувача")
+    parser.add_argument("--queue", type=int, default=64, help="найбільша кількість запитів у черзі")
+    parser.add_argument("--timeout", type=float, default=30.0, help="крайній строк запиту за замовчуванням, с")
+    parser.add_argument("--cache", help="база sqlite кешу розв'язків, спільна для процесів")
+    parser.add_argument("--algorithm", choices=Solver.ALGORITHMS, default="astar")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    args = parser.parse_args()
+
+    server = SolveServer(args.workers, args.queue, args.timeout, args.cache, args.algorithm, args.heuristic)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
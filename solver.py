@@ -1,30 +1,259 @@
-import itertools
-from heapq import heappop, heappush
+import time
+from functools import partial
+from heapq import heapify, heappop, heappush
+
+
+def tile_bits(width):
+    #Кількість бітів на один тайл у запакованому стані: 4 біти для дошок
+    #до 4x4 включно (64-бітне ціле для "15-пазлу"), більше для ширших дошок
+    return max(4, (width * width - 1).bit_length())
+
+
+def pack(tiles, width):
+    #Пакує плоску послідовність тайлів у одне ціле число,
+    #тайл з індексом 'i' займає біти [i * bits, (i + 1) * bits)
+    bits = tile_bits(width)
+    state = 0
+    for tile in reversed(tiles):
+        state = (state << bits) | tile
+    return state
+
+
+def unpack(state, width):
+    #Розпаковує ціле число назад у плоский список тайлів
+    bits = tile_bits(width)
+    mask = (1 << bits) - 1
+    return [(state >> (i * bits)) & mask for i in range(width * width)]
+
+
+_goals = {}
+
+
+def goal_state(width):
+    #Повертає запакований розв'язаний стан для дошки ширини 'width'
+    if width not in _goals:
+        _goals[width] = pack(list(range(1, width * width)) + [0], width)
+    return _goals[width]
+
+
+_moves = {}
+
+
+def move_table(width):
+    #Повертає таблицю ходів для дошки ширини 'width': для кожної позиції
+    #тайлу '0' - список пар (позиція сусіднього тайлу, дія), в порядку
+    #зростання позиції. Таблиця будується один раз для кожної ширини
+    if width not in _moves:
+        table = []
+        for blank in range(width * width):
+            row, col = divmod(blank, width)
+            moves = []
+            if row > 0:
+                moves.append((blank - width, 'up'))
+            if col > 0:
+                moves.append((blank - 1, 'left'))
+            if col < width - 1:
+                moves.append((blank + 1, 'right'))
+            if row < width - 1:
+                moves.append((blank + width, 'down'))
+            table.append(tuple(moves))
+        _moves[width] = tuple(table)
+    return _moves[width]
+
+
+def successors(state, blank, width):
+    #Генерує трійки (стан, позиція '0', дія) для всіх станів, досяжних
+    #одним ходом із запакованого стану 'state'
+    bits = tile_bits(width)
+    mask = (1 << bits) - 1
+    blank_shift = blank * bits
+    for to, action in move_table(width)[blank]:
+        shift = to * bits
+        tile = (state >> shift) & mask
+        yield state ^ (tile << shift) ^ (tile << blank_shift), to, action
+
+
+class Manhattan:
+    #Евристика "манхеттенська відстань" для дошки ширини 'width' до дошки
+    #'goal' (плоский список тайлів; за замовчуванням - розв'язаний стан).
+    #Виклик з запакованим станом повертає повне значення. 'update' дає
+    #значення для дочірнього вузла з батьківського (див. Node.child), а
+    #'reset' і 'delta' оновлюють його по одному ходу на змінюваній дошці
+    #(див. Solver.idastar); 'delta' викликається до того, як хід виконано
+
+    def __init__(self, width, goal=None):
+        self.width = width
+        size = width * width
+        if goal is None:
+            goal = list(range(1, size)) + [0]
+        # Відстань тайлу 'tile' від позиції 'pos' до своєї цільової позиції
+        self.dist = [[0] * size for _ in range(size)]
+        for target, tile in enumerate(goal):
+            if tile == 0:
+                continue
+            x, y = divmod(target, width)
+            for pos in range(size):
+                r, c = divmod(pos, width)
+                self.dist[tile][pos] = abs(x - r) + abs(y - c)
+
+    def __call__(self, state):
+        return self.reset(unpack(state, self.width))
+
+    def reset(self, tiles):
+        return sum(self.dist[tile][pos] for pos, tile in enumerate(tiles))
+
+    def delta(self, tile, at, to):
+        #Зміна евристики при переміщенні тайлу 'tile' з позиції 'at' на 'to'
+        return self.dist[tile][to] - self.dist[tile][at]
+
+    def update(self, state, h, tile, at, to):
+        #Значення евристики після переміщення тайлу 'tile' з позиції 'at' на 'to'
+        #у запакованому стані 'state' зі значенням 'h'; працює за O(1)
+        return h + self.dist[tile][to] - self.dist[tile][at]
+
+
+class LinearConflict(Manhattan):
+    #Манхеттенська відстань з доповненням "лінійного конфлікту": якщо у рядку
+    #(стовпці) стоять тайли, що мають опинитись у цьому ж рядку (стовпці), але
+    #у зворотному порядку, частину з них доведеться вивести з лінії і повернути,
+    #що коштує щонайменше два додаткові ходи на кожен такий тайл.
+    #Хід змінює лише дві лінії, через які він проходить, тож оновлення
+    #перераховує конфлікти тільки для них
+
+    def __init__(self, width):
+        super().__init__(width)
+        self.bits = tile_bits(width)
+        self.mask = (1 << self.bits) - 1
+        self.rows = [[r * width + c for c in range(width)] for r in range(width)]
+        self.cols = [[r * width + c for r in range(width)] for c in range(width)]
+        self.costs = {}
+        self.tiles = None
+
+    def line_cost(self, goals):
+        #Додаткова вартість лінії, де 'goals' - цільові позиції тайлів у лінії
+        #в порядку їх розташування: двічі кількість тайлів поза найдовшою
+        #зростаючою підпослідовністю
+        if goals not in self.costs:
+            longest = [1] * len(goals)
+            for i in range(len(goals)):
+                for j in range(i):
+                    if goals[j] < goals[i] and longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+            self.costs[goals] = 2 * (len(goals) - max(longest, default=0))
+        return self.costs[goals]
+
+    def conflicts(self, get, line, index):
+        #Вартість конфлікту рядка (line == 0) чи стовпця (line == 1) 'index',
+        #де 'get(pos)' повертає тайл на позиції 'pos'
+        width = self.width
+        goals = []
+        for pos in (self.rows if line == 0 else self.cols)[index]:
+            tile = get(pos)
+            if tile != 0 and divmod(tile - 1, width)[line] == index:
+                goals.append(tile)
+        return self.line_cost(tuple(goals))
+
+    def lines_delta(self, get, tile, at, to):
+        #Зміна конфліктів при переміщенні тайлу 'tile' з 'at' на 'to'.
+        #Горизонтальний хід не змінює порядок тайлів у рядку, лише стовпці
+        #'at' і 'to', і навпаки для вертикального ходу
+        line = 1 if at // self.width == to // self.width else 0
+        first, second = divmod(at, self.width)[line], divmod(to, self.width)[line]
+
+        def moved(pos):
+            if pos == to:
+                return tile
+            if pos == at:
+                return 0
+            return get(pos)
+
+        before = self.conflicts(get, line, first) + self.conflicts(get, line, second)
+        after = self.conflicts(moved, line, first) + self.conflicts(moved, line, second)
+        return after - before
+
+    def reset(self, tiles):
+        self.tiles = tiles
+        get = tiles.__getitem__
+        h = super().reset(tiles)
+        for index in range(self.width):
+            h += self.conflicts(get, 0, index) + self.conflicts(get, 1, index)
+        return h
+
+    def delta(self, tile, at, to):
+        #Використовує дошку, передану в 'reset', у стані до ходу
+        return super().delta(tile, at, to) + self.lines_delta(self.tiles.__getitem__, tile, at, to)
+
+    def update(self, state, h, tile, at, to):
+        bits, mask = self.bits, self.mask
+
+        def get(pos):
+            return (state >> (pos * bits)) & mask
+
+        return super().update(state, h, tile, at, to) + self.lines_delta(get, tile, at, to)
+
+
+HEURISTICS = ("manhattan", "linear_conflict", "pdb")
+
+_heuristics = {}
+
+
+def heuristic_for(name, width):
+    #Повертає (один раз створений) екземпляр евристики 'name' для ширини 'width'.
+    #Таблиці "pdb" читаються з файлу, згенерованого 'python pattern_db.py'
+    if (name, width) not in _heuristics:
+        if name == "manhattan":
+            _heuristics[name, width] = Manhattan(width)
+        elif name == "linear_conflict":
+            _heuristics[name, width] = LinearConflict(width)
+        elif name == "pdb":
+            import pattern_db
+            _heuristics[name, width] = pattern_db.load_default(width)
+        else:
+            raise ValueError("Невідома евристика: %s" % name)
+    return _heuristics[name, width]
 
 
 class Node:
     #Клас, що представляє вузол розв'язувача
-    #- 'puzzle' - це екземпляр класу Puzzle
+    #- 'state' - запакований стан дошки (див. 'pack')
+    #- 'blank' - індекс порожнього тайлу у сплющеній дошці
+    #- 'width' - ширина дошки
     #- 'parent' - попередній вузол, створений розв'язувачем, якщо є
     #- 'action' - дія, виконана для отримання головоломки, якщо є
+    #- 'heuristic' - евристика (див. Manhattan), успадковується від 'parent'
+    #- 'h' - значення евристики; обчислюється один раз при створенні вузла,
+    #  для дочірніх вузлів - оновленням значення батька (див. 'child')
+    #Вузол не тримає копію дошки у вигляді списку списків, 'puzzle'
+    #будується лише на вимогу (наприклад, для відображення шляху)
 
-    def __init__(self, puzzle, parent=None, action=None):
-        self.puzzle = puzzle
+    __slots__ = ('state', 'blank', 'width', 'parent', 'action', 'g', 'heuristic', 'h')
+
+    def __init__(self, state, blank, width, parent=None, action=None, heuristic=None, h=None):
+        self.state = state
+        self.blank = blank
+        self.width = width
         self.parent = parent
         self.action = action
         if self.parent is not None:
             self.g = parent.g + 1
+            self.heuristic = parent.heuristic
         else:
             self.g = 0
+            self.heuristic = heuristic or heuristic_for("manhattan", width)
+        self.h = self.heuristic(state) if h is None else h
+
+    @staticmethod
+    def from_puzzle(puzzle, heuristic=None):
+        return Node(puzzle.packed, list(puzzle).index(0), puzzle.width, heuristic=heuristic)
 
     @property
-    def score(self):
-        return self.g + self.h
+    def puzzle(self):
+        #Відновлює екземпляр Puzzle із запакованого стану
+        return Puzzle.from_packed(self.state, self.width)
 
     @property
-    def state(self):
-        #Повертає хешований представлення self
-        return str(self)
+    def score(self):
+        return self.g + self.h
 
     @property
     def path(self):
@@ -38,17 +267,37 @@ class Node:
 
     @property
     def solved(self):
-        #Обгортка для перевірки, чи головоломка 'puzzle' розв'язана
-        return self.puzzle.solved
+        return self.state == goal_state(self.width)
 
     @property
     def actions(self):
         #Обгортка для 'actions', доступних в поточному стані
         return self.puzzle.actions
 
-    @property
-    def h(self):
-        return self.puzzle.manhattan
+    def children(self):
+        #Повертає дочірні вузли, отримані зсувом тайлу '0' у кожному
+        #можливому напрямку. Новий стан отримується з батьківського
+        #обміном двох груп бітів, без копіювання дошки
+
+        return [self.child(to, action) for to, action in move_table(self.width)[self.blank]]
+
+    def follow(self, actions):
+        #Повертає вузол, отриманий з 'self' послідовним виконанням дій 'actions'
+        offsets = {'up': -self.width, 'down': self.width, 'left': -1, 'right': 1}
+        node = self
+        for action in actions:
+            node = node.child(node.blank + offsets[action], action)
+        return node
+
+    def child(self, to, action):
+        #Повертає дочірній вузол, у якому тайл '0' переміщено на позицію 'to'
+
+        width, blank, state = self.width, self.blank, self.state
+        bits = tile_bits(width)
+        tile = (state >> (to * bits)) & ((1 << bits) - 1)
+        child_state = state ^ (tile << (to * bits)) ^ (tile << (blank * bits))
+        h = self.heuristic.update(state, self.h, tile, to, blank)
+        return Node(child_state, to, width, self, action, h=h)
 
     def __str__(self):
         return str(self.puzzle)
@@ -72,37 +321,703 @@ class Node:
         return self.score != other.score
 
 
+class BucketQueue:
+    #Черга з пріоритетом для невеликих цілих оцінок f = g + h: кошик для
+    #кожного f - список стеків за 'g'. Виймається елемент з найменшим f, серед
+    #них - з найбільшим g (найглибший), серед рівних - доданий останнім.
+    #Додавання і виймання - O(1) амортизовано, без порівнянь елементів
+
+    def __init__(self):
+        self.buckets = []  # f -> [стек елементів з g = 0, 1, ...]
+        self.f = 0  # Найменше f, для якого кошик може бути непорожнім
+        self.size = 0
+
+    def push(self, f, g, item):
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        bucket = buckets[f]
+        while len(bucket) <= g:
+            bucket.append([])
+        bucket[g].append(item)
+        if f < self.f:
+            self.f = f
+        self.size += 1
+
+    def pop(self):
+        #Виймає елемент з найменшим f і найбільшим g; черга не має бути порожньою
+        buckets = self.buckets
+        while not buckets[self.f]:
+            self.f += 1
+        bucket = buckets[self.f]
+        item = bucket[-1].pop()
+        # Порожні стеки в кінці прибираються, тож найбільше g - завжди останній
+        while bucket and not bucket[-1]:
+            bucket.pop()
+        self.size -= 1
+        return item
+
+    def __len__(self):
+        return self.size
+
+
+class SearchLimit(Exception):
+    #Пошук перервано до знаходження розв'язку (див. підкласи)
+    pass
+
+
+class SearchTimeout(SearchLimit):
+    #Виникає, коли пошук не вклався у відведений розв'язувачу час
+    pass
+
+
+class NodeLimit(SearchLimit):
+    #Виникає, коли пошук розкрив більше вузлів, ніж дозволено
+    pass
+
+
+class SearchCancelled(SearchLimit):
+    #Піднімається функцією 'progress', щоб скасувати пошук
+    pass
+
+
+class SearchStats:
+    #Лічильники останнього пошуку розв'язувача (див. Solver.stats)
+    #- 'expanded' - розкриті вузли, 'generated' - згенеровані дочірні вузли
+    #- 'duplicates' - дочірні вузли, відкинуті як уже відомі стани
+    #- 'peak_open' - найбільший розмір відкритого списку (для IDA* -
+    #  найбільша глибина рекурсії)
+    #- 'heuristic_time' - час обчислення евристики в секундах; вимірюється
+    #  лише з Solver(..., timing=True)
+    #- 'elapsed' - тривалість пошуку в секундах
+
+    __slots__ = ('expanded', 'generated', 'duplicates', 'peak_open', 'heuristic_time', 'elapsed')
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.peak_open = 0
+        self.heuristic_time = 0.0
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TimedHeuristic:
+    #Обгортка евристики, що додає час кожного виклику до 'stats.heuristic_time'.
+    #Вимірювання коштує кілька викликів perf_counter на вузол, тому вмикається
+    #лише на вимогу (Solver(..., timing=True))
+
+    def __init__(self, heuristic, stats):
+        self.heuristic = heuristic
+        self.stats = stats
+
+    def __call__(self, state):
+        tic = time.perf_counter()
+        h = self.heuristic(state)
+        self.stats.heuristic_time += time.perf_counter() - tic
+        return h
+
+    def reset(self, tiles):
+        tic = time.perf_counter()
+        h = self.heuristic.reset(tiles)
+        self.stats.heuristic_time += time.perf_counter() - tic
+        return h
+
+    def delta(self, tile, at, to):
+        tic = time.perf_counter()
+        d = self.heuristic.delta(tile, at, to)
+        self.stats.heuristic_time += time.perf_counter() - tic
+        return d
+
+    def update(self, state, h, tile, at, to):
+        tic = time.perf_counter()
+        h = self.heuristic.update(state, h, tile, at, to)
+        self.stats.heuristic_time += time.perf_counter() - tic
+        return h
+
+
 class Solver:
     #Розв'язувач головоломки "8-пазл"
     #- 'start' - екземпляр класу Puzzle
+    #- 'algorithm' - алгоритм пошуку: "astar" (А*), "idastar" (IDA*),
+    #  "bidirectional" (двонаправлений А*), "weighted" (зважений А*),
+    #  "arastar" (ARA*, А* з поступовим покращенням розв'язку), "bounded"
+    #  (А* з обмеженою пам'яттю, див. 'memory_limit') або "reduction"
+    #  (швидкий неоптимальний розв'язок дошок будь-якої ширини) або "parallel"
+    #  (IDA* у кількох процесах, див. 'workers')
+    #- 'heuristic' - назва евристики з HEURISTICS або її екземпляр
+    #- 'timeout' - обмеження часу пошуку в секундах, якщо є; при його
+    #  перевищенні 'solve' піднімає SearchTimeout
+    #- 'cache' - кеш розв'язків (див. cache.SolutionCache), якщо є
+    #- 'max_nodes' - обмеження кількості розкритих вузлів, якщо є; при його
+    #  перевищенні 'solve' піднімає NodeLimit
+    #- 'progress' - функція, що викликається з розв'язувачем кожні 'check_every'
+    #  розкритих вузлів (див. 'expanded', 'bound', 'elapsed', 'stats'); може
+    #  підняти SearchCancelled, щоб зупинити пошук
+    #- 'check_every' - інтервал перевірок і викликів 'progress' у розкритих
+    #  вузлах, округлюється вгору до степеня двійки (за замовчуванням CHECK_EVERY)
+    #- 'timing' - вимірювати час обчислення евристики (див. SearchStats)
+    #- 'weight' - вага евристики 'w' для "weighted" (f = g + w * h) і
+    #  початкова вага для "arastar" (за замовчуванням WEIGHT і ARA_WEIGHT)
+    #- 'memory_limit' - обмеження пам'яті пошуку "bounded" у байтах (за
+    #  замовчуванням MEMORY_LIMIT); після його досягнення пошук продовжується
+    #  як IDA* і 'degraded' стає True
+    #- 'workers' - кількість процесів пошуку "parallel" (за замовчуванням -
+    #  кількість ядер)
+    #"weighted" і "arastar" знаходять розв'язок, довший за оптимальний не
+    #більше ніж у 'suboptimality' разів. "arastar" не піднімає SearchLimit,
+    #якщо розв'язок уже знайдено, а повертає найкращий з них: 'timeout'
+    #для нього - бюджет часу, після якого повертається поточний розв'язок
+
+    ALGORITHMS = ("astar", "idastar", "bidirectional", "weighted", "arastar", "bounded", "reduction", "parallel")
+
+    # Вага евристики за замовчуванням і крок її зменшення в "arastar"
+    WEIGHT = 2.0
+    # Початкова вага "arastar": перший прохід майже жадібний, щоб розв'язок
+    # з'явився швидко навіть на складних дошках, далі вага зменшується
+    ARA_WEIGHT = 5.0
+    WEIGHT_STEP = 0.5
+
+    # Обмеження пам'яті "bounded" за замовчуванням, частка таблиці станів у
+    # ньому та оцінка розміру одного запису відкритого списку в байтах
+    MEMORY_LIMIT = 256 * 2 ** 20
+    TABLE_SHARE = 0.25
+    OPEN_ENTRY_BYTES = 56
 
-    def __init__(self, start):
+    # Дія, що скасовує кожну з дій над тайлом '0'
+    OPPOSITE = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
+    # Як часто (у розкритих вузлах) перевіряються обмеження і звітується прогрес
+    CHECK_EVERY = 1024
+
+    def __init__(self, start, algorithm="astar", heuristic="manhattan", timeout=None, cache=None,
+                 max_nodes=None, progress=None, check_every=None, timing=False, weight=None,
+                 memory_limit=None, workers=None):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError("Невідомий алгоритм: %s" % algorithm)
+        if isinstance(heuristic, str):
+            heuristic = heuristic_for(heuristic, start.width)
         self.start = start
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.timeout = timeout
+        self.cache = cache
+        self.max_nodes = max_nodes
+        self.progress = progress
+        # Маска 'expanded & mask == 0' дешевша за ділення з остачею
+        self.check_mask = (1 << ((check_every or self.CHECK_EVERY) - 1).bit_length()) - 1
+        self.timing = timing
+        if weight is None:
+            weight = self.ARA_WEIGHT if algorithm == "arastar" else self.WEIGHT
+        self.weight = weight
+        if self.weight < 1:
+            raise ValueError("Вага евристики має бути не меншою за 1: %s" % weight)
+        self.suboptimality = 1.0  # Межа відношення довжини знайденого розв'язку до оптимальної
+        self.memory_limit = self.MEMORY_LIMIT if memory_limit is None else memory_limit
+        self.workers = workers
+        self.degraded = False  # Чи перейшов пошук "bounded" в IDA* через обмеження пам'яті
+        self.stats = SearchStats()  # Лічильники останнього пошуку
+        self.deadline = None
+        self.started = None  # Час початку останнього пошуку
+        self.bound = 0  # Поточна межа оцінки 'score' (f) пошуку
+        self.expanded = 0  # Кількість розкритих вузлів під час останнього пошуку
+        self.expanded_forward = 0  # Розкриті вузли прямого та зворотного пошуку
+        self.expanded_backward = 0  # у режимі "bidirectional"
 
     def solve(self):
+        #Виконати пошук обраним алгоритмом і повернути шлях до розв'язку, якщо він існує
+
+        if self.start.solved:  # Перевіряємо, чи початкова дошка вже розв'язана
+            return None  # Повертає None, якщо початкова дошка вже розв'язана
+
+        self.expanded = 0
+        self.suboptimality = 1.0
+        self.degraded = False
+        self.stats = SearchStats()
+        self.started = time.perf_counter()
+        if self.cache is not None:
+            actions = self.cache.get(self.start)
+            if actions is not None:
+                return Node.from_puzzle(self.start, self.heuristic).follow(actions).path
+
+        if self.timeout is not None:
+            self.deadline = self.started + self.timeout
+        heuristic = self.heuristic
+        if self.timing:
+            self.heuristic = TimedHeuristic(heuristic, self.stats)
+        try:
+            if self.algorithm == "idastar":
+                path = self.idastar()
+            elif self.algorithm == "bidirectional":
+                path = self.bidirectional()
+            elif self.algorithm == "weighted":
+                path = self.weighted()
+            elif self.algorithm == "arastar":
+                path = self.arastar()
+            elif self.algorithm == "bounded":
+                path = self.bounded()
+            elif self.algorithm == "reduction":
+                path = self.reduction()
+            elif self.algorithm == "parallel":
+                path = self.parallel()
+            else:
+                path = self.astar()
+        finally:
+            self.heuristic = heuristic
+            self.stats.expanded = self.expanded
+            self.stats.elapsed = self.elapsed
+
+        # Кеш зберігає лише оптимальні розв'язки
+        if path is not None and self.cache is not None and self.suboptimality == 1:
+            path = list(path)
+            self.cache.put(self.start, [node.action for node in path[1:]])
+            return path[-1].path
+        return path
+
+    @property
+    def elapsed(self):
+        #Час від початку останнього пошуку в секундах
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def checkpoint(self):
+        #Перевіряє обмеження пошуку і звітує прогрес; викликається
+        #алгоритмами кожні 'check_every' розкритих вузлів
+        self.stats.expanded = self.expanded
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if self.max_nodes is not None and self.expanded >= self.max_nodes:
+            raise NodeLimit()
+        if self.progress is not None:
+            self.progress(self)
+
+    def astar(self):
         #Виконати пошук А* і повернути шлях до розв'язку, якщо він існує
 
+        start_node = Node.from_puzzle(self.start, self.heuristic)
+        open_list = BucketQueue()  # При рівних f першим розкривається глибший вузол
+        open_list.push(start_node.score, 0, start_node)
+        best = {start_node.state: 0}  # Стан -> найменше відоме 'g'
+        check = self.check_mask
+        stats = self.stats
+        # Лічильники ведуться в локальних змінних і переносяться у 'stats'
+        # лише на перевірках; повтори - згенеровані стани, шлях до яких не
+        # покращився
+        generated, pushed, peak = 0, 0, 1
+
+        def flush():
+            stats.generated, stats.peak_open = generated, peak
+            stats.duplicates = generated - pushed
+
+        while open_list:
+            if open_list.size > peak:
+                peak = open_list.size
+            node = open_list.pop()
+            if node.g > best[node.state]:
+                continue  # Застарілий запис: стан уже досягнуто коротшим шляхом
+
+            if node.solved:
+                flush()
+                return node.path
+
+            self.expanded += 1
+            if self.expanded & check == 0:
+                self.bound = node.score
+                flush()
+                self.checkpoint()
+            children = node.children()
+            generated += len(children)
+            for child in children:
+                known = best.get(child.state)
+                if known is None or child.g < known:
+                    best[child.state] = child.g
+                    open_list.push(child.g + child.h, child.g, child)
+                    pushed += 1
+
+        flush()
+        return None
+
+    def weighted(self):
+        #Виконати зважений пошук А* (f = g + w * h) і повернути шлях до
+        #розв'язку, якщо він існує. Стан повертається у відкритий список, якщо
+        #шлях до нього покращився, але розкриті стани повторно не
+        #розкриваються, тож довжина розв'язку не перевищує оптимальну більше
+        #ніж у 'w' разів (при w = 1 - оптимальна, як у А*)
+
+        weight = self.weight
+        start_node = Node.from_puzzle(self.start, self.heuristic)
+        # Записи (ключ, -g, вузол): при рівних ключах першим розкривається
+        # глибший вузол, як і в "arastar" та BucketQueue
+        open_list = [(start_node.g + weight * start_node.h, 0, start_node)]
+        best = {start_node.state: 0}  # Стан -> найменше відоме 'g'
+        closed = set()
+        check = self.check_mask
+        stats = self.stats
+        self.suboptimality = weight
+
+        while open_list:
+            if len(open_list) > stats.peak_open:
+                stats.peak_open = len(open_list)
+            _, _, node = heappop(open_list)
+            if node.g > best[node.state] or node.state in closed:
+                continue  # Застарілий запис або вже розкритий стан
+            closed.add(node.state)
+
+            if node.solved:
+                return node.path
+
+            self.expanded += 1
+            if self.expanded & check == 0:
+                self.bound = node.score
+                self.checkpoint()
+            children = node.children()
+            stats.generated += len(children)
+            for child in children:
+                known = best.get(child.state)
+                if child.state in closed or (known is not None and known <= child.g):
+                    stats.duplicates += 1
+                    continue
+                best[child.state] = child.g
+                heappush(open_list, (child.g + weight * child.h, -child.g, child))
+
+        return None
+
+    def arastar(self):
+        #Виконати пошук ARA* і повернути найкращий знайдений шлях до розв'язку.
+        #Серія зважених пошуків А* зі спадною вагою: кожен наступний
+        #повторно використовує значення 'g' попереднього і розкриває лише
+        #стани, шлях до яких покращився. Після кожного розв'язку межа
+        #'suboptimality' = min(w, довжина / найменша оцінка g + h серед
+        #нерозкритих станів); пошук завершується, коли вона досягає 1
+        #(розв'язок оптимальний) або спрацьовує обмеження пошуку
+
+        goal = goal_state(self.start.width)
+        start_node = Node.from_puzzle(self.start, self.heuristic)
+        best = {start_node.state: start_node}  # Стан -> вузол з найменшим 'g'
+        weight = self.weight
+        # Записи (ключ, -g, вузол): при рівних ключах першим розкривається
+        # глибший вузол, як і в BucketQueue
+        open_list = [(start_node.g + weight * start_node.h, 0, start_node)]
+        closed = set()
+        inconsistent = {}  # Розкриті стани, 'g' яких покращився на поточному проході
+        check = self.check_mask
+        stats = self.stats
+        solution = None
+        self.suboptimality = float("inf")
+
+        def lower_bound():
+            #Найменша оцінка g + h серед станів, що ще можуть покращити розв'язок
+            nodes = [node for _, _, node in open_list if best[node.state] is node]
+            nodes.extend(inconsistent.values())
+            return min([node.score for node in nodes], default=solution.g)
+
+        try:
+            while True:
+                # Прохід зваженого А*: розкриваємо, доки ключ найкращого
+                # відкритого стану менший за довжину знайденого розв'язку
+                while open_list:
+                    key, _, node = open_list[0]
+                    if best[node.state] is not node or node.state in closed:
+                        heappop(open_list)  # Застарілий запис
+                        continue
+                    if solution is not None and solution.g <= key:
+                        break
+                    heappop(open_list)
+                    closed.add(node.state)
+
+                    self.expanded += 1
+                    if self.expanded & check == 0:
+                        self.bound = node.score
+                        self.checkpoint()
+                    children = node.children()
+                    stats.generated += len(children)
+                    for child in children:
+                        known = best.get(child.state)
+                        if known is not None and known.g <= child.g:
+                            stats.duplicates += 1
+                            continue
+                        best[child.state] = child
+                        if child.state == goal:
+                            solution = child
+                        elif child.state in closed:
+                            inconsistent[child.state] = child
+                        else:
+                            heappush(open_list, (child.g + weight * child.h, -child.g, child))
+                    if len(open_list) > stats.peak_open:
+                        stats.peak_open = len(open_list)
+
+                if solution is None:
+                    return None
+                self.suboptimality = min(weight, solution.g / lower_bound())
+                if self.suboptimality <= 1:
+                    self.suboptimality = 1.0
+                    return solution.path
 
-        if not self.start.solved:  # Перевіряємо, чи початкова дошка вже розв'язана
-            start_node = Node(self.start)
-            open_list = [(start_node.score, start_node)]
-            seen = set()
-            seen.add(start_node.state)
+                # Наступний прохід з меншою вагою: повертаємо у відкритий
+                # список стани з покращеним 'g' і перераховуємо ключі
+                weight = max(1.0, min(weight - self.WEIGHT_STEP, self.suboptimality))
+                nodes = {node.state: node for _, _, node in open_list
+                         if best[node.state] is node and node.state not in closed}
+                nodes.update(inconsistent)
+                open_list = [(node.g + weight * node.h, -node.g, node) for node in nodes.values()]
+                heapify(open_list)
+                inconsistent = {}
+                closed = set()
+        except SearchLimit:
+            # Оцінка через 'lower_bound' справедлива і посеред проходу
+            if solution is None:
+                raise
+            self.suboptimality = max(1.0, min(self.suboptimality, solution.g / lower_bound()))
+            return solution.path
 
-            while open_list:
-                _, node = heappop(open_list)
+    def bounded(self):
+        #Виконати пошук А* з обмеженою пам'яттю і повернути шлях до розв'язку,
+        #якщо він існує. Відомі стани зберігаються в StateTable фіксованого
+        #розміру разом з глибиною і 2-бітним кодом дії, якою їх досягнуто;
+        #запис відкритого списку - одне ціле число (f, h, позиція '0', стан),
+        #тож при рівних f першим розкривається глибший стан. Коли таблиця
+        #заповнена або відкритий список перевищує свою частку 'memory_limit',
+        #обидва звільняються і пошук продовжується як IDA* з межею f
+        #поточного стану - найменшою оцінкою ще не знайденого розв'язку
+        from state_table import CODES, DIRECTIONS, StateTable
 
-                if node.solved:
-                    return node.path
+        width = self.start.width
+        if width > 4:
+            raise ValueError("Пошук \"bounded\" підтримує дошки до 4x4")
+        size = width * width
+        bits = tile_bits(width)
+        tile_mask = (1 << bits) - 1
+        shift = bits * size  # Стан займає молодші 'shift' бітів запису
+        state_mask = (1 << shift) - 1
+        neighbours = move_table(width)
+        heuristic = self.heuristic
+        goal = goal_state(width)
 
-                for move, action in node.actions:
-                    child = Node(move(), node, action)
+        table = StateTable.for_memory(self.memory_limit * self.TABLE_SHARE)
+        open_limit = (self.memory_limit - table.nbytes) // self.OPEN_ENTRY_BYTES
+        tiles = list(self.start)
+        start, blank, h = pack(tiles, width), tiles.index(0), heuristic.reset(tiles)
+        table.store(table.find(start), start, 0, 0)
+        open_list = [(((h << 8 | h) << 8 | blank) << shift) | start]
+        check = self.check_mask
+        stats = self.stats
+        keys, depths = table.keys, table.depths
 
-                    if child.state not in seen:
-                        heappush(open_list, (child.score, child))
-                        seen.add(child.state)
+        while open_list:
+            if len(open_list) > stats.peak_open:
+                stats.peak_open = len(open_list)
+            entry = heappop(open_list)
+            state = entry & state_mask
+            blank = (entry >> shift) & 0xFF
+            h = (entry >> (shift + 8)) & 0xFF
+            f = entry >> (shift + 16)
+            g = f - h
+            if depths[table.find(state)] < g:
+                continue  # Застарілий запис: стан уже досягнуто коротшим шляхом
 
-        return None  # Повертає None, якщо початкова дошка вже розв'язана
+            if state == goal:
+                break
+
+            self.expanded += 1
+            if self.expanded & check == 0:
+                self.bound = f
+                self.checkpoint()
+            if table.full or len(open_list) > open_limit:
+                del open_list, table, keys, depths
+                self.degraded = True
+                return self.idastar(f)
+
+            for to, action in neighbours[blank]:
+                stats.generated += 1
+                tile = (state >> (to * bits)) & tile_mask
+                child = state ^ (tile << (to * bits)) ^ (tile << (blank * bits))
+                slot = table.find(child)
+                if keys[slot] == child and depths[slot] <= g + 1:
+                    stats.duplicates += 1
+                    continue
+                child_h = heuristic.update(state, h, tile, to, blank)
+                table.store(slot, child, g + 1, CODES[action])
+                heappush(open_list, (((g + 1 + child_h << 8 | child_h) << 8 | to) << shift) | child)
+        else:
+            return None
+
+        # Шлях відновлюється від розв'язаного стану зворотними ходами
+        offsets = {'up': -width, 'down': width, 'left': -1, 'right': 1}
+        actions = []
+        while state != start:
+            action = DIRECTIONS[table.code(table.find(state))]
+            actions.append(action)
+            previous = blank - offsets[action]
+            tile = (state >> (previous * bits)) & tile_mask
+            state ^= (tile << (previous * bits)) ^ (tile << (blank * bits))
+            blank = previous
+        return Node.from_puzzle(self.start, heuristic).follow(actions[::-1]).path
+
+    def reduction(self):
+        #Розв'язати дошку, збираючи її по рядках і стовпцях (див.
+        #reduction.Reduction), і повернути шлях до розв'язку, якщо він існує.
+        #Межа відношення довжини розв'язку до оптимальної невідома
+        from reduction import Reduction
+
+        self.suboptimality = float("inf")
+        actions = Reduction(list(self.start), self.start.width).solve()
+        if actions is None:
+            return None
+        return Node.from_puzzle(self.start, self.heuristic).follow(actions).path
+
+    def parallel(self):
+        #Виконати паралельний пошук IDA* у 'workers' процесах (див.
+        #parallel.parallel_idastar) і повернути шлях до розв'язку, якщо він існує
+        from parallel import parallel_idastar
+
+        return parallel_idastar(self, self.workers)
+
+    def bidirectional(self):
+        #Виконати двонаправлений пошук А* і повернути шлях до розв'язку, якщо
+        #він існує. Прямий пошук іде від початкової дошки з обраною евристикою,
+        #зворотний - від розв'язаної дошки з манхеттенською відстанню до
+        #початкової. На кожному кроці розкривається сторона з меншим відкритим
+        #списком; знайдений шлях через стан, відомий обом сторонам, оптимальний,
+        #щойно його довжина не перевищує найменшої оцінки 'score' хоча б однієї
+        #зі сторін
+
+        width = self.start.width
+        goal = Puzzle.from_packed(goal_state(width), width)
+        roots = (Node.from_puzzle(self.start, self.heuristic),
+                 Node.from_puzzle(goal, Manhattan(width, list(self.start))))
+        open_lists = ([(roots[0].score, roots[0])], [(roots[1].score, roots[1])])
+        best = ({roots[0].state: roots[0]}, {roots[1].state: roots[1]})  # Стан -> вузол з найменшим 'g'
+        expanded = [0, 0]
+        check = self.check_mask
+        stats = self.stats
+        length, meeting = None, None
+
+        while open_lists[0] and open_lists[1]:
+            if len(open_lists[0]) + len(open_lists[1]) > stats.peak_open:
+                stats.peak_open = len(open_lists[0]) + len(open_lists[1])
+            if length is not None and length <= max(open_lists[0][0][0], open_lists[1][0][0]):
+                break
+
+            side = 0 if len(open_lists[0]) <= len(open_lists[1]) else 1
+            _, node = heappop(open_lists[side])
+            if best[side][node.state] is not node:
+                continue  # Застарілий запис: стан уже досягнуто коротшим шляхом
+
+            expanded[side] += 1
+            self.expanded += 1
+            if self.expanded & check == 0:
+                self.bound = node.score
+                self.checkpoint()
+            children = node.children()
+            stats.generated += len(children)
+            for child in children:
+                known = best[side].get(child.state)
+                if known is not None and known.g <= child.g:
+                    stats.duplicates += 1
+                    continue
+                best[side][child.state] = child
+                heappush(open_lists[side], (child.score, child))
+
+                other = best[1 - side].get(child.state)
+                if other is not None and (length is None or child.g + other.g < length):
+                    length = child.g + other.g
+                    meeting = (child, other) if side == 0 else (other, child)
+
+        self.expanded_forward, self.expanded_backward = expanded
+        if meeting is None:
+            return None
+
+        # Зворотна половина шляху - ходи від розв'язаної дошки до точки зустрічі;
+        # від точки зустрічі до розв'язаної дошки їх виконуємо у зворотному порядку
+        forward, backward = meeting
+        actions = [self.OPPOSITE[node.action] for node in backward.path if node.parent is not None][::-1]
+        return forward.follow(actions).path
+
+    def idastar(self, bound=None):
+        #Виконати пошук IDA* і повернути шлях до розв'язку, якщо він існує.
+        #Кожна ітерація - прохід 'bounded_dfs' з межею f по одній змінюваній
+        #дошці. Пам'ять обмежена глибиною рекурсії.
+        #'bound' - початкова межа f, якщо відома нижня оцінка розв'язку
+
+        width = self.start.width
+        tiles = list(self.start)
+        blank = tiles.index(0)
+        heuristic = self.heuristic
+        check = self.check_mask
+        stats = self.stats
+        path = []  # Послідовність пар (позиція '0', дія) від кореня
+
+        def expand(g, children):
+            self.expanded += 1
+            if self.expanded & check == 0:
+                self.checkpoint()
+            if g >= stats.peak_open:
+                stats.peak_open = g + 1
+            stats.generated += children
+
+        h = heuristic.reset(tiles)
+        bound = h if bound is None else max(h, bound)
+        while True:
+            self.bound = bound
+            t = bounded_dfs(tiles, width, heuristic, bound, blank, 0, h, None, path, expand)
+            if t is True:
+                break
+            if t is None:
+                return None  # Немає жодного ходу, розв'язку не існує
+            bound = t
+
+        node = Node.from_puzzle(self.start, heuristic)
+        for to, action in path:
+            node = node.child(to, action)
+        return node.path
+
+
+def bounded_dfs(tiles, width, heuristic, bound, blank, g, h, previous, path, expand):
+    #Один прохід IDA*: пошук у глибину з межею f 'bound' від дошки 'tiles'
+    #(плоский список, змінюється на місці: хід виконується і скасовується
+    #після повернення) з позицією '0' 'blank', глибиною 'g', евристикою 'h'
+    #(див. heuristic.reset) і попередньою дією 'previous'; хід, що скасовує
+    #попередній, відсікається. 'expand(g, children)' викликається для кожного
+    #розкритого вузла з кількістю його дочірніх вузлів і може підняти виняток,
+    #щоб зупинити пошук. Повертає True, якщо розв'язок знайдено (ходи - у
+    #'path' як пари (позиція '0', дія), дошка залишається розв'язаною), інакше
+    #найменшу f понад межу або None, якщо ходів немає
+    neighbours = move_table(width)
+    goal = list(range(1, width * width)) + [0]
+    opposite = Solver.OPPOSITE
+
+    def search(blank, g, h, previous):
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and tiles == goal:
+            return True
+
+        moves = neighbours[blank]
+        expand(g, len(moves) - (previous is not None))
+        minimum = None
+        for to, action in moves:
+            if opposite[action] == previous:
+                continue
+            tile = tiles[to]
+            child_h = h + heuristic.delta(tile, to, blank)
+            tiles[blank], tiles[to] = tile, 0
+            path.append((to, action))
+
+            t = search(to, g + 1, child_h, action)
+            if t is True:
+                return t
+
+            path.pop()
+            heuristic.delta(tile, blank, to)
+            tiles[blank], tiles[to] = 0, tile
+            if minimum is None or t < minimum:
+                minimum = t
+        return minimum
+
+    return search(blank, g, h, previous)
 
 
 class Puzzle:
@@ -127,6 +1042,16 @@ class Puzzle:
 
         return Puzzle(board)
 
+    @staticmethod
+    def from_packed(state, width):
+        tiles = unpack(state, width)
+        return Puzzle([tiles[i:i + width] for i in range(0, len(tiles), width)])
+
+    @property
+    def packed(self):
+        #Компактне представлення дошки у вигляді одного цілого числа
+        return pack(list(self), self.width)
+
     @property
     def solved(self):
         #Головоломка розв'язана, якщо числа у сплющеній дошці знаходяться в
@@ -141,23 +1066,13 @@ class Puzzle:
     def actions(self):
         #Повертає список пар 'move', 'action'. 'move' можна викликати,
         #щоб отримати нову головоломку, яка виникає в результаті зсуву тайлу '0'
-        #в напрямку 'action'.
-
-        def create_move(at, to):
-            return lambda: self._move(at, to)
-
-        moves = []
-        for i, j in itertools.product(range(self.width), range(self.width)):
-            direcs = {'right': (i, j - 1),
-                      'left': (i, j + 1),
-                      'down': (i - 1, j),
-                      'up': (i + 1, j)}
-
-            for action, (r, c) in direcs.items():
-                if 0 <= r < self.width and 0 <= c < self.width and self.board[r][c] == 0:
-                    move = create_move((i, j), (r, c)), action
-                    moves.append(move)
-        return moves
+        #в напрямку 'action'. Це обгортка сумісності над 'move_table';
+        #пошук генерує сусідні стани напряму через 'successors'
+
+        width = self.width
+        blank = list(self).index(0)
+        return [(partial(self._move, divmod(at, width), divmod(blank, width)), action)
+                for at, action in move_table(width)[blank]]
 
     @property
     def manhattan(self):
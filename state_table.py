@@ -0,0 +1,81 @@
+from array import array
+
+# Коди дій тайлу '0' у порядку 'move_table' (2 біти на код)
+DIRECTIONS = ('up', 'left', 'right', 'down')
+CODES = {action: code for code, action in enumerate(DIRECTIONS)}
+
+# Байтів на комірку таблиці: ключ (8), глибина (1) і чверть байта коду дії
+SLOT_BYTES = 8 + 1 + 0.25
+
+# Найбільше заповнення таблиці, після якого вона вважається повною
+MAX_LOAD = 0.75
+
+# Множник хешування Фібоначчі для 64-бітних ключів
+_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+class StateTable:
+    #Хеш-таблиця з відкритою адресацією для запакованих станів дошок до 4x4
+    #(ключ уміщується в 64 біти, див. solver.pack), що займає фіксований
+    #обсяг пам'яті незалежно від кількості станів:
+    #- 'keys' - стани (0 - порожня комірка; запакований стан ніколи не 0)
+    #- 'depths' - найменша відома глибина 'g' стану (до 255)
+    #- 'codes' - 2-бітні коди дії (див. DIRECTIONS), якою стан досягнуто з
+    #  батьківського; сам батько відновлюється зворотним ходом, тож
+    #  посилання на вузли не зберігаються
+    #Лінійне зондування; видалення не підтримується
+
+    def __init__(self, capacity):
+        bits = max(4, (capacity - 1).bit_length())
+        self.capacity = 1 << bits  # Степінь двійки, щоб індекс брався маскою
+        self.shift = 64 - bits
+        self.mask = self.capacity - 1
+        self.keys = array('Q', bytes(8 * self.capacity))
+        self.depths = bytearray(self.capacity)
+        self.codes = bytearray((self.capacity + 3) // 4)
+        self.count = 0
+        self.limit = int(self.capacity * MAX_LOAD)
+
+    @staticmethod
+    def for_memory(nbytes):
+        #Повертає найбільшу таблицю, що вміщується в 'nbytes' байтів
+        capacity = 1 << max(4, int(nbytes / SLOT_BYTES).bit_length() - 1)
+        return StateTable(capacity)
+
+    @property
+    def nbytes(self):
+        return self.keys.itemsize * len(self.keys) + len(self.depths) + len(self.codes)
+
+    @property
+    def full(self):
+        return self.count >= self.limit
+
+    def find(self, state):
+        #Повертає індекс комірки зі станом 'state' або порожньої комірки,
+        #куди його слід записати
+        keys, mask = self.keys, self.mask
+        slot = ((state * _MULTIPLIER) & _MASK) >> self.shift
+        key = keys[slot]
+        while key != state and key != 0:
+            slot = (slot + 1) & mask
+            key = keys[slot]
+        return slot
+
+    def store(self, slot, state, depth, code):
+        #Записує стан у комірку 'slot', отриману з 'find'
+        if self.keys[slot] == 0:
+            self.keys[slot] = state
+            self.count += 1
+        self.depths[slot] = depth
+        byte, offset = slot >> 2, (slot & 3) << 1
+        self.codes[byte] = (self.codes[byte] & ~(3 << offset) & 0xFF) | (code << offset)
+
+    def code(self, slot):
+        return (self.codes[slot >> 2] >> ((slot & 3) << 1)) & 3
+
+    def __contains__(self, state):
+        return self.keys[self.find(state)] == state
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,126 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+# Пакетна перевірка дошок: масив форми (N, width * width), кожен рядок -
+# сплющена дошка у форматі 'Puzzle.from_string'. Всі функції повертають
+# масиви довжини N і не містять циклів Python по дошках
+
+
+def valid_mask(boards, width):
+    #Маска дошок, що є перестановками чисел 0..width * width - 1
+    boards = np.asarray(boards)
+    size = width * width
+    if boards.ndim != 2 or boards.shape[1] != size:
+        return np.zeros(len(boards), dtype=bool)
+    return (np.sort(boards, axis=1) == np.arange(size)).all(axis=1)
+
+
+# Дошки обробляються частинами, щоб дерева частини вміщувались у кеш процесора
+CHUNK = 16384
+
+
+def inversion_counts(boards, width):
+    #Кількість інверсій серед ненульових тайлів кожної дошки, O(n log n) на
+    #дошку: дерево Фенвіка (BIT) ведеться для всіх дошок одночасно, цикл іде
+    #лише по позиціях і рівнях дерева. Дошки мають бути перестановками
+    boards = np.asarray(boards)
+    inversions = np.zeros(len(boards), dtype=np.int32)
+    for start in range(0, len(boards), CHUNK):
+        inversions[start:start + CHUNK] = _inversion_counts(boards[start:start + CHUNK])
+    return inversions
+
+
+def _inversion_counts(boards):
+    count, size = boards.shape
+    levels = size.bit_length()
+    # Індекси 1..size - 1 - саме дерево; індекс 'size' - запасна комірка, куди
+    # "виходять" оновлення, тож усі рядки йдуть однаковою кількістю кроків
+    # без масок. Індекс 0 завжди містить 0
+    stride = size + 1
+    tree = np.zeros(count * stride, dtype=np.int16)
+    base = np.arange(count, dtype=np.intp) * stride
+    inversions = np.zeros(count, dtype=np.int32)
+    seen = np.zeros(count, dtype=np.int32)
+
+    for pos in range(size):
+        number = boards[:, pos].astype(np.intp)
+        tile = number != 0
+
+        # Кількість уже переглянутих тайлів, не більших за 'number'
+        smaller = np.zeros(count, dtype=np.int32)
+        i = number.copy()
+        for _ in range(levels):
+            smaller += tree[base + i]
+            i -= i & -i
+        inversions += np.where(tile, seen - smaller, 0)
+        seen += tile
+
+        # Порожня плитка записується у запасну комірку і не впливає на запити
+        i = np.where(tile, number, size)
+        for _ in range(levels):
+            tree[base + i] += 1
+            i = np.minimum(i + (i & -i), size)
+    return inversions
+
+
+def solvable_mask(boards, width):
+    #Маска розв'язних дошок за парністю інверсій та рядка порожньої плитки
+    #(те саме правило, що й Game.is_solvable). Дошки мають бути перестановками
+    boards = np.asarray(boards)
+    inversions = inversion_counts(boards, width)
+    if width % 2 == 1:
+        return inversions % 2 == 0
+    empty_row = width - np.argmax(boards == 0, axis=1) // width  # Рядок порожньої плитки знизу
+    return (inversions + empty_row) % 2 == 1
+
+
+def check_boards(boards, width):
+    #Маска дошок, які є коректними перестановками і мають розв'язок
+    boards = np.asarray(boards)
+    mask = valid_mask(boards, width)
+    if mask.any():
+        mask[mask] = solvable_mask(boards[mask], width)
+    return mask
+
+
+def parse_boards(lines, width):
+    #Перетворює рядки формату 'Puzzle.from_string' на масив (N, width * width);
+    #рядки з неправильною кількістю чисел стають рядками з -1
+    size = width * width
+    rows = []
+    for line in lines:
+        numbers = line.split()
+        if len(numbers) == size and all(number.isdigit() for number in numbers):
+            rows.append(list(map(int, numbers)))
+        else:
+            rows.append([-1] * size)
+    return np.array(rows, dtype=np.int64).reshape(-1, size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Відбір коректних розв'язних дошок (одна дошка на рядок)")
+    parser.add_argument("input", help="файл з дошками або '-' для стандартного вводу")
+    parser.add_argument("--size", type=int, default=4)
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    with source:
+        lines = [line.strip() for line in source if line.strip()]
+
+    boards = parse_boards(lines, args.size)
+    tic = time.perf_counter()
+    mask = check_boards(boards, args.size)
+    toc = time.perf_counter()
+
+    for line, ok in zip(lines, mask):
+        if ok:
+            print(line)
+    rate = len(lines) / (toc - tic) if toc > tic else 0
+    print("Перевірено %d дошок, придатних %d, %.0f дошок/с" % (len(lines), mask.sum(), rate), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()